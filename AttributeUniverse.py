@@ -0,0 +1,56 @@
+class AttributeUniverse:
+    """
+    Interned attribute names of one base relation.
+    Every element gets a bit position the first time it is seen, so an attribute set becomes an
+    int bitmask and subset, union and equality tests are single integer operations. Masks are
+    built by iterating the given collection, exactly like set(): elements that are themselves
+    frozensets (nested keys) are interned as one element, and a string is read as its characters.
+    """
+    def __init__(self, attributes=()):
+        self.names = []  # bit position -> element
+        self.bits = {}  # element -> bit position
+        self.frozen_masks = {}  # frozenset -> mask, frozensets cache their hash so this is cheap
+        for attribute in attributes:
+            self.bit(attribute)
+
+    def __len__(self):
+        return len(self.names)
+
+    def bit(self, element):
+        """ Return the bit position of an element, interning it if it is new. """
+        position = self.bits.get(element)
+        if position is None:
+            position = self.bits[element] = len(self.names)
+            self.names.append(element)
+        return position
+
+    def mask(self, attributes):
+        """ Bitmask of a collection of attributes (None is the empty set). """
+        if attributes is None:
+            return 0
+        if isinstance(attributes, frozenset):
+            mask = self.frozen_masks.get(attributes)
+            if mask is None:
+                mask = self.frozen_masks[attributes] = self.build_mask(attributes)
+            return mask
+        return self.build_mask(attributes)
+
+    def build_mask(self, attributes):
+        mask = 0
+        for element in attributes:
+            mask |= 1 << self.bit(element)
+        return mask
+
+    def names_of(self, mask):
+        """ Set view of a bitmask. """
+        names = set()
+        while mask:
+            low = mask & -mask
+            names.add(self.names[low.bit_length() - 1])
+            mask ^= low
+        return names
+
+    @staticmethod
+    def is_subset(mask, other):
+        """ True if every attribute of mask is in other. """
+        return mask & ~other == 0
@@ -1,4 +1,6 @@
 from Relation import Relation
+from AttributeUniverse import AttributeUniverse
+from ClosureEngine import ClosureEngine
 from copy import deepcopy
 
 class BCNF:
@@ -11,7 +13,7 @@ class BCNF:
         - X is a superkey of the relation.
         """
         print(f"Checking if the relation {relation.tablename} is in BCNF with updated FDs.")
-        for determinant, dependent in relation.fd_map.items():
+        for determinant, dependent in relation.cover_items():
             if not BCNF.is_superkey(relation, determinant):
                 print(f"FD {determinant} -> {dependent} violates BCNF.")
                 return False
@@ -21,15 +23,10 @@ class BCNF:
     @staticmethod
     def is_superkey(relation: Relation, determinant_set: frozenset) -> bool:
         """
-        Checks if the given determinant_set is a superkey (i.e., it contains the primary key or any candidate key).
+        Checks if the given determinant_set is a superkey: it contains the primary key or a candidate key,
+        or its closure under the relation's FDs covers every attribute of the relation.
         """
-        if determinant_set.issuperset(relation.pk):
-            return True
-        if relation.cks:
-            for ck in relation.cks:
-                if determinant_set.issuperset(ck):
-                    return True
-        return False
+        return relation.is_superkey(determinant_set)
 
     @staticmethod
     def normalise(relation: Relation):
@@ -53,15 +50,17 @@ class BCNF:
             pk=relation.pk,
             cks=relation.cks.copy() if relation.cks is not None else [],
             MvalAttr=relation.MvalAttr,
-            df=relation.df.copy() if relation.df is not None else None
+            df=relation.shared_data()
         )
-        remaining_fd_map = relation.fd_map.copy()
+        # Decompose over the minimal cover: no redundant FDs and no extraneous determinant attributes
+        cover = relation.cover_items()
+        remaining_fd_map = dict(cover)
         
         print(f"Initial attributes of relation {relation.tablename}: {relation.attributes}")
         
         base_name = relation.tablename
 
-        for determinant, dependent in list(relation.fd_map.items()):
+        for determinant, dependent in cover:
             if not BCNF.is_superkey(relation, determinant):
                 print(f"Decomposing relation based on FD {determinant} -> {dependent} violating BCNF.")
                 
@@ -83,7 +82,7 @@ class BCNF:
                     pk=new_pk,
                     cks=[],  # Candidate keys are processed separately
                     MvalAttr=None,
-                    df=relation.df[list(new_relation_attributes)].copy() if relation.df is not None else None
+                    df=relation.project(new_relation_attributes)
                 )
                 
                 print(f"New relation created: {new_relation.tablename} with attributes {new_relation.attributes} and primary key {new_relation.pk}")
@@ -139,6 +138,95 @@ class BCNF:
         print(f"BCNF normalization complete. Normalized relations: {[rel.tablename for rel in normalized_relations]}")
         return normalized_relations
 
+    @staticmethod
+    def decompose_polynomial(relation: Relation):
+        """
+        Closure-driven BCNF decomposition in the style of Tsou and Fischer, an alternative to normalise().
+        Violations are found on the schema alone, with closures under the relation's FDs and keys:
+        - starting from the remaining schema Z, shrink Y := Y - B while some A, B in Y have A in (Y - AB)+,
+          preferring pairs where (Y - AB) does not also determine B,
+        - output Y and continue with Z := Z - A for the last A, which keeps the decomposition lossless
+          because Y - A -> A.
+        A Y without such a pair is in BCNF: a projected FD X -> A with X + A smaller than Y would give
+        one, so the only projected FDs are (Y - A) -> A, which make up the FDs of the fragment.
+        This may split more than normalise() does. Every step is a polynomial number of linear-time
+        closures. The data is only touched by the lazy projection of each final fragment.
+        """
+        print(f"Starting polynomial BCNF decomposition for relation: {relation.tablename}")
+        universe = relation.universe
+        engine = relation.closure_engine(use_keys=True)
+        key_masks = [key for key in relation.key_masks() if key]
+
+        def violating_pair(schema):
+            """ Some (A, B) in the schema with A in (schema - AB)+, or None when the schema is in BCNF. """
+            fallback = None
+            for a in ClosureEngine.positions(schema):
+                for b in ClosureEngine.positions(schema):
+                    if a == b:
+                        continue
+                    determined = engine.closure(schema & ~(1 << a) & ~(1 << b))
+                    if determined >> a & 1:
+                        if not determined >> b & 1:
+                            return a, b
+                        fallback = fallback or (a, b)
+            return fallback
+
+        fragments = []
+        remaining = relation.mask(relation.attributes)
+        while True:
+            fragment, last = remaining, None
+            pair = violating_pair(fragment)
+            while pair is not None:
+                a, b = pair
+                fragment &= ~(1 << b)
+                pair = violating_pair(fragment)
+                last = a
+            fragments.append(fragment)
+            if last is None:
+                break
+            remaining &= ~(1 << last)
+
+        fragments = [fragment for i, fragment in enumerate(fragments)
+                     if not any(j != i and AttributeUniverse.is_subset(fragment, other) and (fragment != other or j < i)
+                                for j, other in enumerate(fragments))]
+
+        normalized_relations = []
+        for counter, fragment in enumerate(fragments, start=1):
+            attributes = universe.names_of(fragment)
+            # Primary key: the declared key when it survives, otherwise a minimized superkey
+            pk = next((key for key in key_masks if AttributeUniverse.is_subset(key, fragment)), None)
+            if pk is None:
+                pk = fragment
+                for position in ClosureEngine.positions(fragment):
+                    smaller = pk & ~(1 << position)
+                    if AttributeUniverse.is_subset(fragment, engine.closure(smaller)):
+                        pk = smaller
+            new_relation = Relation(
+                tablename=f"{relation.tablename}_part{counter}" if counter > 1 else relation.tablename,
+                attributes=attributes,
+                pk=frozenset(universe.names_of(pk)),
+                cks=[],
+                MvalAttr=None,
+                df=relation.project(attributes)
+            )
+            new_relation.universe = universe
+            # Projected FDs: the fragment has no violating pair, so they are the (Y - A) -> A that hold
+            for position in ClosureEngine.positions(fragment):
+                rest = fragment & ~(1 << position)
+                if rest and engine.closure(rest) >> position & 1:
+                    new_relation.fd_map[frozenset(universe.names_of(rest))] = universe.names_of(1 << position)
+            for mvd_determinant, mvd_dependent_lists in deepcopy(relation.mvd_map).items():
+                for mvd_dependent_list in mvd_dependent_lists:
+                    if mvd_determinant.union(*mvd_dependent_list) <= attributes:
+                        print(f"Moving MVD: {mvd_determinant} -->> {mvd_dependent_list}")
+                        new_relation.add_mvd(mvd_determinant, mvd_dependent_list)
+            new_relation.cks = BCNF.identify_candidate_keys(new_relation)
+            print(f"BCNF fragment {new_relation.tablename}: attributes {attributes}, primary key {new_relation.pk}")
+            normalized_relations.append(new_relation)
+
+        print(f"Polynomial BCNF decomposition complete. Normalized relations: {[rel.tablename for rel in normalized_relations]}")
+        return normalized_relations
+
     @staticmethod
     def recompute_primary_key(relation, original_relation):
         new_primary_key = frozenset(attr for attr in original_relation.pk if attr in relation.attributes)
@@ -168,18 +256,16 @@ class BCNF:
 
     @staticmethod
     def find_minimal_superkey(relation):
-        if relation.fd_map:
-            for determinant in relation.fd_map.keys():
-                if determinant.issubset(relation.attributes):
-                    return determinant
-        return relation.attributes
+        """ Return the smallest candidate key implied by the relation's FDs (all attributes if there is none). """
+        candidate_keys = relation.candidate_keys()
+        return candidate_keys[0] if candidate_keys else relation.attributes
 
     @staticmethod
     def identify_candidate_keys(relation: Relation):
+        """ Enumerate the candidate keys of the relation from its FDs and declared keys. """
         # Initialize candidate keys as an empty list if `cks` is None
         if relation.cks is None:
             relation.cks = []
         
-        candidate_keys = [ck for ck in relation.cks if all(attr in relation.attributes for attr in ck)]
+        candidate_keys = relation.candidate_keys()
         return candidate_keys if candidate_keys else None
-
@@ -0,0 +1,77 @@
+class ClosureEngine:
+    """
+    Attribute closure X+ under a fixed set of FDs, on bitmasks of an AttributeUniverse.
+    Uses the counter-based linear algorithm: every FD keeps a count of left-hand attributes not
+    yet in the closure, each attribute lists the FDs whose left-hand side contains it, and an FD
+    fires when its count reaches zero. Every attribute is processed once, so a closure costs
+    O(|X| + total FD size). Results are cached per determinant mask.
+    """
+    def __init__(self, universe, fds):
+        """ fds is an iterable of (lhs, rhs) attribute collections; a str rhs is one attribute. """
+        self.universe = universe
+        self.index_fds((universe.mask(lhs), universe.mask({rhs} if isinstance(rhs, str) else rhs)) for lhs, rhs in fds)
+
+    @classmethod
+    def from_masks(cls, universe, fd_masks):
+        """ Build an engine from (lhs_mask, rhs_mask) pairs. """
+        engine = cls.__new__(cls)
+        engine.universe = universe
+        engine.index_fds(fd_masks)
+        return engine
+
+    def index_fds(self, fd_masks):
+        self.lhs = []
+        self.rhs = []
+        self.by_attribute = {}  # bit position -> indexes of the FDs whose lhs contains it
+        for lhs_mask, rhs_mask in fd_masks:
+            index = len(self.lhs)
+            self.lhs.append(lhs_mask)
+            self.rhs.append(rhs_mask)
+            for position in self.positions(lhs_mask):
+                self.by_attribute.setdefault(position, []).append(index)
+        self.lhs_sizes = [mask.bit_count() for mask in self.lhs]
+        self.unconditional = [index for index, size in enumerate(self.lhs_sizes) if size == 0]
+        self.cache = {}
+
+    @staticmethod
+    def positions(mask):
+        """ Bit positions set in a mask, lowest first. """
+        while mask:
+            low = mask & -mask
+            yield low.bit_length() - 1
+            mask ^= low
+
+    def closure(self, mask, excluded=None):
+        """
+        Bitmask of the closure of the attributes in mask.
+        FDs whose indexes are in excluded are ignored; such closures are not cached.
+        """
+        cached = self.cache.get(mask) if excluded is None else None
+        if cached is not None:
+            return cached
+
+        missing = list(self.lhs_sizes)
+        if excluded:
+            for index in excluded:
+                missing[index] = -1  # never reaches zero
+        result = mask
+        pending = list(self.positions(mask))
+        for index in self.unconditional:
+            if excluded and index in excluded:
+                continue
+            added = self.rhs[index] & ~result
+            result |= added
+            pending.extend(self.positions(added))
+
+        while pending:
+            for index in self.by_attribute.get(pending.pop(), ()):
+                missing[index] -= 1
+                if missing[index] == 0:
+                    added = self.rhs[index] & ~result
+                    if added:
+                        result |= added
+                        pending.extend(self.positions(added))
+
+        if excluded is None:
+            self.cache[mask] = result
+        return result
@@ -0,0 +1,211 @@
+import hashlib
+from array import array
+import numpy as np
+import pandas as pd
+
+
+def encode_column(values):
+    """
+    Dictionary-encode a single column.
+    Returns (codes, dictionary) where codes are int32 positions into dictionary.
+    """
+    codes, uniques = pd.factorize(np.asarray(values, dtype=object), use_na_sentinel=False)
+    return codes.astype(np.int32, copy=False), np.asarray(uniques, dtype=object)
+
+
+def densify(ids):
+    """
+    Renumber an integer array so that its values are 0..k-1 (in order of first appearance).
+    Returns (dense_ids, k).
+    """
+    dense, uniques = pd.factorize(ids)
+    return dense.astype(np.int64, copy=False), len(uniques)
+
+
+def group_ids(code_arrays, nrows, base=None):
+    """
+    Combine several code arrays into one dense group id per row.
+    Rows that agree on every array get the same id. If base is given as (ids, ngroups),
+    the grouping is refined from it instead of starting from a single group.
+    Returns (ids, ngroups).
+    """
+    if base is None:
+        ids, ngroups = np.zeros(nrows, dtype=np.int64), (1 if nrows else 0)
+    else:
+        ids, ngroups = base
+    for codes in code_arrays:
+        width = int(codes.max()) + 1 if len(codes) else 1
+        ids, ngroups = densify(ids * width + codes)
+    return ids, ngroups
+
+
+def as_encoded(data):
+    """ The data as an EncodedTable: a DataFrame is encoded, an EncodedTable is returned as it is. """
+    return data if isinstance(data, EncodedTable) else EncodedTable.from_dataframe(data)
+
+
+class EncodedTable:
+    """
+    Columnar table where every column is stored once as int32 codes plus a dictionary of values.
+    Code arrays are read-only and shared between a table and its projections, so projecting
+    never copies data; values are only decoded again by to_dataframe(). Row groupings are cached
+    in partition_cache (Partitions.PartitionCache), which projections share as well.
+    """
+    def __init__(self, codes, dictionaries, columns=None, nrows=None):
+        self.columns = list(codes) if columns is None else list(columns)
+        self.codes = {col: codes[col] for col in self.columns}
+        self.dictionaries = {col: dictionaries[col] for col in self.columns}
+        for column in self.codes.values():
+            column.flags.writeable = False
+        if nrows is None:
+            nrows = len(self.codes[self.columns[0]]) if self.columns else 0
+        self.nrows = nrows
+        self.partition_cache = None  # PartitionCache, created on first use by PartitionCache.of
+
+    @classmethod
+    def from_dataframe(cls, df):
+        """ Encode every column of a DataFrame. """
+        codes, dictionaries = {}, {}
+        for col in df.columns:
+            codes[col], dictionaries[col] = encode_column(df[col])
+        return cls(codes, dictionaries, list(df.columns), len(df))
+
+    @classmethod
+    def from_rows(cls, columns, rows):
+        """ Encode a list of row tuples. """
+        codes, dictionaries = {}, {}
+        for position, col in enumerate(columns):
+            codes[col], dictionaries[col] = encode_column([row[position] for row in rows])
+        return cls(codes, dictionaries, columns, len(rows))
+
+    def __len__(self):
+        return self.nrows
+
+    def __getstate__(self):
+        """ Pickle the columns only; the partition cache is rebuilt on demand. """
+        state = self.__dict__.copy()
+        state["partition_cache"] = None
+        return state
+
+    @property
+    def shape(self):
+        return (self.nrows, len(self.columns))
+
+    def project(self, columns):
+        """ Projection on the given columns (bag semantics); shares the code arrays and the partition cache. """
+        table = EncodedTable(self.codes, self.dictionaries, list(columns), self.nrows)
+        table.partition_cache = self.partition_cache
+        return table
+
+    def take(self, rows):
+        """ Table made of the given row positions. """
+        return EncodedTable({col: self.codes[col][rows] for col in self.columns}, self.dictionaries,
+                            self.columns, len(rows))
+
+    def group_ids(self, columns, base=None):
+        """ Dense group id per row for the given columns, see ColumnEncoding.group_ids. """
+        return group_ids([self.codes[col] for col in columns], self.nrows, base)
+
+    def drop_duplicates(self):
+        """ Keep the first occurrence of every distinct row, in the original order. """
+        ids, ngroups = self.group_ids(self.columns)
+        if ngroups == self.nrows:
+            return self
+        return self.take(np.sort(np.unique(ids, return_index=True)[1]))
+
+    def value(self, column, row):
+        """ Decoded value of one cell. """
+        return self.dictionaries[column][self.codes[column][row]]
+
+    def fingerprint(self):
+        """ Content hash of the column names, codes and dictionaries. """
+        digest = hashlib.sha1()
+        digest.update(repr(self.columns).encode())
+        for col in self.columns:
+            digest.update(np.ascontiguousarray(self.codes[col]).tobytes())
+            digest.update(pd.util.hash_array(self.dictionaries[col]).tobytes())
+        return digest.hexdigest()
+
+    def to_dataframe(self):
+        """ Decode the table into a pandas DataFrame. """
+        return pd.DataFrame({col: self.dictionaries[col][self.codes[col]] for col in self.columns},
+                            columns=self.columns).infer_objects()
+
+
+
+class Projection:
+    """
+    Lazy projection of an EncodedTable on a list of columns.
+    Only the column list is stored until materialize() is called; the materialized table shares
+    the parent's read-only code arrays and, for a distinct projection, keeps the first occurrence
+    of every row. Projections of unmaterialized projections point straight at the underlying table.
+    """
+    def __init__(self, parent, columns, distinct=True):
+        columns = list(columns)
+        missing = [col for col in columns if col not in parent.columns]
+        if missing:
+            raise KeyError(f"{missing} not in index")
+        # A distinct projection of a projection is a distinct projection of its parent
+        while isinstance(parent, Projection) and parent._table is None and (distinct or not parent.distinct):
+            parent = parent.parent
+        self.parent = parent
+        self.columns = columns
+        self.distinct = distinct
+        self._table = None
+
+    def materialize(self):
+        """ Return the projected rows as an EncodedTable, computing them on first use. """
+        if self._table is None:
+            table = self.parent.materialize() if isinstance(self.parent, Projection) else self.parent
+            table = table.project(self.columns)
+            self._table = table.drop_duplicates() if self.distinct else table
+        return self._table
+
+
+class StreamingEncoder:
+    """
+    Dictionary-encode rows one at a time, keeping only one dictionary and one int32 code
+    buffer per column, so memory follows the encoded size rather than the raw rows.
+    """
+    def __init__(self, columns, fill=''):
+        self.columns = list(columns)
+        self.fill = fill
+        self.lookups = [{} for _ in self.columns]
+        self.values = [[] for _ in self.columns]
+        self.buffers = [array('i') for _ in self.columns]
+        self.nrows = 0
+
+    def encode(self, position, value):
+        lookup = self.lookups[position]
+        code = lookup.get(value)
+        if code is None:
+            code = lookup[value] = len(self.values[position])
+            self.values[position].append(value)
+        return code
+
+    def add_column(self, name):
+        """ Add a column, back-filling the rows seen so far with the fill value. """
+        self.columns.append(name)
+        self.lookups.append({})
+        self.values.append([])
+        self.buffers.append(array('i'))
+        position = len(self.columns) - 1
+        if self.nrows:
+            self.buffers[position].extend([self.encode(position, self.fill)] * self.nrows)
+
+    def append(self, row):
+        """ Encode one row; missing trailing cells take the fill value. """
+        for position in range(len(self.columns)):
+            value = row[position] if position < len(row) else self.fill
+            self.buffers[position].append(self.encode(position, value))
+        self.nrows += 1
+
+    def finish(self):
+        """ Return the rows encoded so far as an EncodedTable. """
+        codes, dictionaries = {}, {}
+        for col, buffer, values in zip(self.columns, self.buffers, self.values):
+            codes[col] = np.frombuffer(buffer, dtype=np.int32) if len(buffer) else np.empty(0, dtype=np.int32)
+            dictionary = np.empty(len(values), dtype=object)
+            dictionary[:] = values
+            dictionaries[col] = dictionary
+        return EncodedTable(codes, dictionaries, self.columns, self.nrows)
@@ -0,0 +1,120 @@
+from ClosureEngine import ClosureEngine
+from AttributeUniverse import AttributeUniverse
+from ColumnEncoding import as_encoded
+from Partitions import PartitionCache, StrippedPartition
+
+class FDgenerator:
+    """
+    Discover the minimal non-trivial FDs of a table from its data (TANE).
+    The attribute lattice is walked level by level on bitmasks of the columns:
+    - X - {A} -> A holds iff the stripped partitions of X - {A} and X have the same error,
+    - the right-hand-side candidates C+(X) drop every attribute already determined by a subset
+      of X, and sets with no candidate left are not extended,
+    - a key X yields X -> A for its remaining candidates and is not extended either,
+    - the partition of a new set is the product of two of its subsets from the level below.
+    """
+    def __init__(self, df, attributes=None, max_lhs=None):
+        """
+        Only the columns in attributes (all by default) are used; max_lhs bounds the size of the
+        determinants searched.
+        """
+        self.table = as_encoded(df)
+        self.columns = [col for col in self.table.columns if attributes is None or col in attributes]
+        self.universe = AttributeUniverse(self.columns)  # bit position i is self.columns[i]
+        self.max_lhs = len(self.columns) if max_lhs is None else max_lhs
+        self.partitions = PartitionCache.of(self.table)
+
+    def find_all_fds(self):
+        """ Return the minimal non-trivial FDs as (determinant frozenset, dependent attribute) pairs. """
+        nrows = self.table.nrows
+        full = (1 << len(self.columns)) - 1
+        scratch = self.partitions.scratch_array()
+        found = {}  # dependent position -> determinant masks, for the minimality test of keys
+        fds = []
+
+        def record(lhs, position):
+            found.setdefault(position, []).append(lhs)
+            fds.append((frozenset(self.universe.names_of(lhs)), self.columns[position]))
+
+        candidates = {0: full}  # C+ of the sets of the previous level
+        errors = {0: StrippedPartition.whole(nrows).error}
+        # Single columns come from the shared cache; wider levels are TANE's own and released level by level
+        level = {1 << position: self.partitions.get([col]) for position, col in enumerate(self.columns)}
+        size = 1
+        while level and size <= self.max_lhs + 1:
+            level_candidates, level_errors = {}, {}
+            for mask, partition in level.items():
+                cplus = full
+                for position in ClosureEngine.positions(mask):
+                    cplus &= candidates.get(mask & ~(1 << position), 0)
+                level_errors[mask] = partition.error
+                for position in ClosureEngine.positions(mask & cplus):
+                    if errors[mask & ~(1 << position)] == partition.error:
+                        record(mask & ~(1 << position), position)
+                        cplus &= mask & ~(1 << position)
+                level_candidates[mask] = cplus
+
+            for mask in list(level):
+                cplus = level_candidates[mask]
+                if not cplus:
+                    del level[mask]
+                elif level[mask].is_unique():
+                    if size <= self.max_lhs:
+                        for position in ClosureEngine.positions(cplus & ~mask):
+                            if not any(lhs & ~mask == 0 for lhs in found.get(position, ())):
+                                record(mask, position)
+                    del level[mask]
+
+            candidates, errors = level_candidates, level_errors
+            level = self.next_level(level, scratch)
+            size += 1
+
+        print(f"FD discovery found {len(fds)} minimal FDs over {len(self.columns)} columns and {nrows} rows.")
+        return fds
+
+    @staticmethod
+    def next_level(level, scratch):
+        """
+        Sets one attribute larger whose subsets all survived, joined from pairs sharing all but the
+        highest attribute. A partition is only needed inside its block, so it is released as soon
+        as its block is done and at most one level plus one block is held in memory.
+        """
+        survivors = set(level)
+        blocks = {}
+        for mask in level:
+            blocks.setdefault(mask & ~(1 << (mask.bit_length() - 1)), []).append(mask)
+        new_level = {}
+        for block in blocks.values():
+            for i, first in enumerate(block):
+                for second in block[i + 1:]:
+                    mask = first | second
+                    if all(mask & ~(1 << position) in survivors for position in ClosureEngine.positions(mask)):
+                        new_level[mask] = level[first].product(level[second], scratch)
+            for mask in block:
+                del level[mask]
+        return new_level
+
+    def dependencies(self):
+        """ The discovered FDs grouped by determinant, determinant frozenset -> set of dependents. """
+        grouped = {}
+        for determinant, dependent in self.find_all_fds():
+            grouped.setdefault(determinant, set()).add(dependent)
+        return grouped
+
+    @staticmethod
+    def discover(relation, max_lhs=None):
+        """
+        Discover the FDs of a relation's data and add them with add_fd.
+        Constant columns (FDs with an empty determinant) are reported but not added.
+        """
+        print(f"Discovering FDs for relation {relation.tablename} from its data...")
+        if relation.encoded is None:
+            print("The relation has no data to discover FDs from.")
+            return {}
+        grouped = FDgenerator(relation.encoded, relation.attributes, max_lhs).dependencies()
+        for determinant, dependents in grouped.items():
+            if not determinant:
+                print(f"Constant attributes {dependents} are not added as FDs.")
+                continue
+            relation.add_fd(set(determinant), dependents)
+        return grouped
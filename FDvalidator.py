@@ -0,0 +1,65 @@
+import numpy as np
+from ColumnEncoding import as_encoded
+from Partitions import PartitionCache
+
+class FDvalidator:
+    """
+    Check declared FDs against the data in one batched pass.
+    Each distinct determinant is grouped once (its stripped partition, from the shared
+    PartitionCache) and the grouping is reused for all of its dependents: X -> A is violated
+    exactly when some row of an X class has another A code than the first row of that class,
+    and those two rows are returned as the counterexample.
+    """
+    def __init__(self, df):
+        self.df = as_encoded(df)
+        self.partitions = PartitionCache.of(self.df)
+
+    def violations(self, fds):
+        """
+        Check (determinant, dependents) pairs, e.g. fd_map.items().
+        Returns a list of (determinant, dependent, (row, other_row)) for the violated FDs, where the
+        two rows agree on the determinant and differ on the dependent. FDs naming attributes
+        that are not in the data are returned with None instead of a pair of rows.
+        """
+        violations = []
+        for determinant, dependents in fds:
+            dependents = {dependents} if isinstance(dependents, str) else dependents
+            if any(col not in self.df.codes for col in set(determinant) | set(dependents)):
+                violations.extend((frozenset(determinant), dependent, None) for dependent in sorted(dependents))
+                continue
+            partition = self.partitions.get(determinant)
+            # Rows of every determinant class side by side, with the first row of its class for each
+            order = np.argsort(partition.labels, kind="stable")
+            rows, labels = partition.rows[order], partition.labels[order]
+            first = rows[np.unique(labels, return_index=True)[1]][labels]
+            for dependent in sorted(dependents):
+                codes = self.df.codes[dependent]
+                differing = np.flatnonzero(codes[rows] != codes[first])
+                if len(differing):
+                    violations.append((frozenset(determinant), dependent, (int(first[differing[0]]), int(rows[differing[0]]))))
+        return violations
+
+    def describe(self, violation):
+        """ One-line explanation of a violation. """
+        determinant, dependent, pair = violation
+        if pair is None:
+            return f"FD {set(determinant)} -> {dependent} refers to attributes missing from the data"
+        row, other = pair
+        key = tuple(self.df.value(col, row) for col in sorted(determinant))
+        return (f"FD {set(determinant)} -> {dependent} is violated by rows {row} and {other}: "
+                f"both have {key} but {dependent} is {self.df.value(dependent, row)!r} and {self.df.value(dependent, other)!r}")
+
+    @staticmethod
+    def verify(relation):
+        """ Check every FD of a relation against its data; returns the violations and prints each one. """
+        print(f"Verifying the FDs of relation {relation.tablename} against its data...")
+        if relation.encoded is None:
+            print("The relation has no data to verify against.")
+            return []
+        validator = FDvalidator(relation.encoded)
+        violations = validator.violations(relation.fd_map.items())
+        for violation in violations:
+            print(validator.describe(violation))
+        if not violations:
+            print("All FDs hold.")
+        return violations
@@ -1,9 +1,24 @@
 from Relation import Relation
-from itertools import chain, combinations
-import pandas as pd
+from itertools import chain, combinations, islice
 from copy import deepcopy
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
+from JoinDependency import JoinDependencyChecker
+
+# Checker of the relation being searched, installed once per worker process
+_worker_checker = None
+
+def _init_partition_worker(checker):
+    global _worker_checker
+    _worker_checker = checker
+
+def _check_partition_chunk(chunk):
+    """ Return the positions of the lossless partitions in a chunk """
+    return [index for index, partition in enumerate(chunk) if _worker_checker.holds(partition)]
 
 class FiveNF:
+    # Number of partitions handed to a worker at a time
+    chunk_size = 256
+
     @staticmethod
     def get_all_subsets(attributes):
         """ Helper function to get all non-empty subsets of attributes, excluding single-element sets """
@@ -13,72 +28,156 @@ class FiveNF:
 
     @staticmethod
     def get_partitions(attributes):
-        """ Generate all valid partitions of a set of attributes into N subsets """
-        all_subsets = FiveNF.get_all_subsets(attributes)
-        partitions = []
-        
-        for i in range(2, len(attributes) // 2 + 2):
-            for partition in combinations(all_subsets, i):
-                if any(len(subset) == 1 for subset in partition) or any(set(subset) == set(attributes) for subset in partition):
+        """
+        Lazily generate candidate join dependencies: collections of 2 .. n//2+1 components that
+        - cover all attributes,
+        - have a connected intersection graph (otherwise the join is a cartesian product),
+        - are non-redundant (no component is contained in another).
+        Components have 2 .. n-1 attributes, are listed in canonical order (by size, then by
+        attribute position), and branches that can no longer cover all attributes are cut early.
+        """
+        attributes = list(attributes)
+        n = len(attributes)
+        full = (1 << n) - 1
+        # Candidate components as bitmasks over attribute positions, in canonical order
+        components = [sum(1 << i for i in combo) for r in range(2, n) for combo in combinations(range(n), r)]
+
+        def to_partition(chosen):
+            return tuple(tuple(attributes[i] for i in range(n) if mask >> i & 1) for mask in chosen)
+
+        def is_connected(chosen):
+            reached, frontier = chosen[0], [chosen[0]]
+            remaining = list(chosen[1:])
+            while frontier:
+                current = frontier.pop()
+                linked = [mask for mask in remaining if mask & current]
+                remaining = [mask for mask in remaining if not mask & current]
+                frontier.extend(linked)
+            return not remaining
+
+        def extend(target, start, chosen, covered):
+            slots = target - len(chosen)
+            if slots == 0:
+                if covered == full and is_connected(chosen):
+                    yield to_partition(chosen)
+                return
+            for index in range(start, len(components) - slots + 1):
+                mask = components[index]
+                # Components only grow from here on, so the widest choice left bounds what can still be covered
+                if bin(full & ~(covered | mask)).count("1") > (slots - 1) * (n - 1):
                     continue
+                if any(previous & mask == previous for previous in chosen):
+                    continue
+                chosen.append(mask)
+                yield from extend(target, index + 1, chosen, covered | mask)
+                chosen.pop()
 
-                if set().union(*partition) == set(attributes):
-                    valid = True
-                    for idx, subset in enumerate(partition):
-                        if not any(set(subset).intersection(set(partition[j])) for j in range(len(partition)) if j != idx):
-                            valid = False
-                            break
-
-                    if valid:
-                        print(f"Valid partition found: {partition}")
-                        partitions.append(partition)
-                    else:
-                        print(f"Invalid partition due to no common attributes: {partition}")
-
-        print(f"Generated partitions: {partitions}")
-        return partitions
+        for i in range(2, n // 2 + 2):
+            yield from extend(i, 0, [], 0)
 
     @staticmethod
-    def test_lossless_join_multiple(subsets, original_df):
-        """ Perform a lossless join test for multiple partitions """
+    def test_lossless_join_multiple(subsets, original_df, checker=None):
+        """
+        Perform a lossless join test for multiple partitions.
+        The check runs on dictionary-encoded projections and compares the join with the
+        original relation as a set of tuples; pass a JoinDependencyChecker to reuse the
+        encoding across partitions of the same relation.
+        """
         print(f"Testing lossless join for partition: {subsets}")
-        common_columns = set(subsets[0])
-        result_df = original_df[list(common_columns)].drop_duplicates()
-        
-        for subset in subsets[1:]:
-            subset_df = original_df[list(subset)].drop_duplicates()
-            common_columns = common_columns.intersection(set(subset))
-            print(f"Common columns for join: {common_columns}")
-            if not common_columns:
-                print(f"No common columns found between subsets {subsets[0]} and {subset}, invalid join.")
-                return False
-            result_df = pd.merge(result_df, subset_df, on=list(common_columns), how='inner')
-
-        joined_columns = list(set().union(*subsets))
-        valid_columns = [col for col in joined_columns if col in result_df.columns and col in original_df.columns]
-        result_match = result_df[valid_columns].equals(original_df[valid_columns])
-        print(f"Join result matches original: {result_match}")
-
         union_of_subsets = set().union(*subsets)
         if union_of_subsets != set(original_df.columns):
             print(f"Union of subsets {subsets} does not match the original attributes. Skipping.")
             return False
 
+        if checker is None:
+            checker = JoinDependencyChecker(original_df)
+        result_match = checker.holds(subsets)
+        print(f"Join result matches original: {result_match}")
+
         if result_match:
-            with open("Losslessresultsubsets.txt", "a") as file:
-                file.write(f"Valid lossless join partition: {subsets}\n")
+            FiveNF.record_lossless(subsets)
         return result_match
 
     @staticmethod
-    def normalise(relation: Relation):
-        """ Normalize the relation to 5NF if it's not already in 5NF """
-        if FiveNF.isin(relation):
+    def record_lossless(subsets):
+        """ Append a lossless partition to the running log """
+        with open("Losslessresultsubsets.txt", "a") as file:
+            file.write(f"Valid lossless join partition: {subsets}\n")
+
+    @staticmethod
+    def find_join_dependencies(relation: Relation, first_only=False, workers=1):
+        """
+        Return the lossless partitions of the relation in generation order.
+        With first_only, the search stops at the first one. With more than one worker the
+        partitions are checked in chunks by a process pool; the encoded relation is sent to
+        each worker once, chunks past a known answer are cancelled, and results are merged
+        in chunk order so the outcome matches the serial search.
+        """
+        table = relation.encoded
+        partitions = FiveNF.get_partitions(table.columns)
+        checker = JoinDependencyChecker(table)
+        found = []
+
+        if workers <= 1:
+            for partition in partitions:
+                if FiveNF.test_lossless_join_multiple(partition, table, checker):
+                    found.append(partition)
+                    if first_only:
+                        break
+            return found
+
+        chunks = iter(lambda: list(islice(partitions, FiveNF.chunk_size)), [])
+        results = {}  # chunk index -> lossless partitions in that chunk
+        pending = {}  # future -> (chunk index, chunk)
+        stop_at = None  # earliest chunk known to hold an answer when first_only is set
+        submitted = 0
+        exhausted = False
+        pool = ProcessPoolExecutor(max_workers=workers, initializer=_init_partition_worker, initargs=(checker,))
+        try:
+            while True:
+                while not exhausted and stop_at is None and len(pending) < 2 * workers:
+                    chunk = next(chunks, None)
+                    if chunk is None:
+                        exhausted = True
+                        break
+                    pending[pool.submit(_check_partition_chunk, chunk)] = (submitted, chunk)
+                    submitted += 1
+                if not pending:
+                    break
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    index, chunk = pending.pop(future)
+                    hits = future.result()
+                    results[index] = [chunk[position] for position in hits]
+                    if first_only and hits and (stop_at is None or index < stop_at):
+                        stop_at = index
+                if stop_at is not None:
+                    # Later chunks cannot change the answer any more
+                    for future, (index, _) in list(pending.items()):
+                        if index > stop_at:
+                            future.cancel()
+                            del pending[future]
+        finally:
+            pool.shutdown(wait=True, cancel_futures=True)
+
+        for index in sorted(results):
+            if stop_at is not None and index > stop_at:
+                break
+            for partition in results[index]:
+                print(f"Testing lossless join for partition: {partition}")
+                print("Join result matches original: True")
+                FiveNF.record_lossless(partition)
+                found.append(partition)
+        return found[:1] if first_only else found
+
+    @staticmethod
+    def normalise(relation: Relation, workers=1):
+        """ Normalize the relation to 5NF if it's not already in 5NF; workers is passed to the partition search """
+        if FiveNF.isin(relation, workers):
             print(f"Relation {relation.tablename} is already in 5NF. No normalization needed.")
             return [relation]
 
-        attributes = relation.df.columns
-        partitions = FiveNF.get_partitions(attributes)
-        new_relations = []
+        attributes = relation.encoded.columns
         last_decomposition = []
 
         output_file = "OutputFileFor5NF.txt"
@@ -86,44 +185,21 @@ class FiveNF:
             file.write("Normalization process for 5NF\n")
             file.write(f"Original attributes: {relation.attributes}\n\n")
             
-            for partition in partitions:
-                if FiveNF.test_lossless_join_multiple(partition, relation.df):
-                    print(f"Join dependency detected for partition: {partition}")
-                    union_of_partition = set().union(*partition)
-                    if union_of_partition != set(attributes):
-                        print(f"Partition {partition} does not cover all attributes. Skipping.")
-                        file.write(f"Partition {partition} does not cover all attributes. Skipping.\n")
-                        continue
-
-                    last_decomposition = []
-
-                    for subset in partition:
-                        new_relation = Relation(
-                            tablename=f"{relation.tablename}_Decomposed_{'_'.join(subset)}",
-                            attributes=set(subset),
-                            pk={col for col in subset if col in relation.pk},
-                            cks=[ck for ck in relation.cks if ck <= set(subset)],
-                            MvalAttr=set(),
-                            df=relation.df[list(subset)].drop_duplicates().copy(),
-                            original=relation,
-                            base_relation=relation.base_relation
-                        )
-                        new_relation.mvd_map = {}
-                        new_relation.fd_map = {}
-                        
-                        for fd_determinant, fd_dependents in deepcopy(relation.fd_map).items():
-                            if fd_determinant <= set(subset):
-                                fd_dependent_subset = fd_dependents & set(subset)
-                                if fd_dependent_subset:
-                                    new_relation.add_fd(fd_determinant, fd_dependent_subset)
-
-                        # Ensure the primary key is also added as a candidate key if it’s minimal
-                        if new_relation.pk and new_relation.pk not in new_relation.cks:
-                            new_relation.cks.append(new_relation.pk)
-
-                        last_decomposition.append(new_relation)
-                        print(f"Created new relation: {new_relation.tablename} from {subset}")
-                    file.write(f"Appended decomposition: {partition}\n")
+            chosen_partition = None
+            for partition in FiveNF.find_join_dependencies(relation, workers=workers):
+                print(f"Join dependency detected for partition: {partition}")
+                union_of_partition = set().union(*partition)
+                if union_of_partition != set(attributes):
+                    print(f"Partition {partition} does not cover all attributes. Skipping.")
+                    file.write(f"Partition {partition} does not cover all attributes. Skipping.\n")
+                    continue
+
+                # Only the last lossless partition is kept, so relations are built once after the search
+                chosen_partition = partition
+                file.write(f"Appended decomposition: {partition}\n")
+
+            if chosen_partition is not None:
+                last_decomposition = FiveNF.decompose(relation, chosen_partition)
 
             file.write("\nSchema details for the final lossless decomposition:\n")
             for final_relation in last_decomposition:
@@ -138,13 +214,42 @@ class FiveNF:
         return last_decomposition
 
     @staticmethod
-    def isin(relation: Relation) -> bool:
-        """ Check if the relation is in 5NF """
-        attributes = relation.df.columns
-        partitions = FiveNF.get_partitions(attributes)
-        for partition in partitions:
-            if FiveNF.test_lossless_join_multiple(partition, relation.df):
-                print(f"Join dependency detected for partition: {partition}")
-                return False
+    def decompose(relation: Relation, partition):
+        """ Build one relation per component of a lossless partition """
+        decomposition = []
+        for subset in partition:
+            new_relation = Relation(
+                tablename=f"{relation.tablename}_Decomposed_{'_'.join(subset)}",
+                attributes=set(subset),
+                pk={col for col in subset if col in relation.pk},
+                cks=[ck for ck in relation.cks if ck <= set(subset)],
+                MvalAttr=set(),
+                df=relation.project(subset),
+                original=relation,
+                base_relation=relation.base_relation
+            )
+            new_relation.mvd_map = {}
+            new_relation.fd_map = {}
+            
+            for fd_determinant, fd_dependents in deepcopy(relation.fd_map).items():
+                if fd_determinant <= set(subset):
+                    fd_dependent_subset = fd_dependents & set(subset)
+                    if fd_dependent_subset:
+                        new_relation.add_fd(fd_determinant, fd_dependent_subset)
+
+            # Ensure the primary key is also added as a candidate key if it’s minimal
+            if new_relation.pk and new_relation.pk not in new_relation.cks:
+                new_relation.cks.append(new_relation.pk)
+
+            decomposition.append(new_relation)
+            print(f"Created new relation: {new_relation.tablename} from {subset}")
+        return decomposition
+
+    @staticmethod
+    def isin(relation: Relation, workers=1) -> bool:
+        """ Check if the relation is in 5NF; workers is passed to the partition search """
+        for partition in FiveNF.find_join_dependencies(relation, first_only=True, workers=workers):
+            print(f"Join dependency detected for partition: {partition}")
+            return False
         print(f"Relation {relation.tablename} is in 5NF")
         return True
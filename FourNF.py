@@ -1,7 +1,7 @@
 from collections import defaultdict
 from copy import deepcopy
 from Relation import Relation
-from MVDgenerator import MVDgenerator
+from MVDgenerator import mvd_discovery_cache
 class FourNF:
     @staticmethod
     def isin(relation: Relation):
@@ -14,8 +14,6 @@ class FourNF:
             print("--------------------------------",dependent_lists)
             is_valid = True
             valid_mvds[determinant]=[]
-            mvdgen=MVDgenerator(relation.df,relation.attributes)
-            mvdgen.find_and_validate_all_mvds()
             for dependent_list in dependent_lists:
                 if relation.validate_each_mvd(determinant,dependent_list):
                     valid_mvds[determinant].append(dependent_list)
@@ -36,8 +34,7 @@ class FourNF:
                         determinant.union(dependent_set) == relation.attributes):
                         print(f"Relation is not in 4NF due to non-trivial MVD: {determinant} -->> {dependent_set}")
                         return False
-        mvdgen=MVDgenerator(relation.df,relation.attributes)
-        generated_mvds=mvdgen.find_and_validate_all_mvds()
+        generated_mvds=mvd_discovery_cache.find_and_validate_all_mvds(relation.encoded,relation.attributes)
         for [determinant_set,dependent_set1,dependent_set2] in generated_mvds:
 
             relation.add_mvd(determinant_set,[dependent_set1, dependent_set2])
@@ -86,7 +83,7 @@ class FourNF:
                             
                             # Debug: Check if there are columns for new attributes
                             print(f"Creating DataFrame for new relation from columns: {list(new_attr)}")
-                            print(f"Available columns in DataFrame: {relation.df.columns}")
+                            print(f"Available columns in DataFrame: {relation.encoded.columns}")
 
                             # Create the new relation
                             new_relation = Relation(
@@ -95,7 +92,7 @@ class FourNF:
                                 pk=deepcopy(new_pk),
                                 cks=deepcopy(new_cks),
                                 MvalAttr=set(),  # No multivalued attributes in the new relation
-                                df=relation.df[list(new_attr)].copy(),  # Project the DataFrame for the new relation
+                                df=relation.project(new_attr),  # Lazy projection, extracted when the new relation reads it
                                 original=relation,  # Keep a reference to the original relation
                                 base_relation=relation.base_relation  # Keep a reference to the base relation
                             )
@@ -130,10 +127,10 @@ class FourNF:
 
             # Debug: Check if there are columns for leftover attributes
             print(f"Creating DataFrame for leftover relation from columns: {list(new_relation_attr)}")
-            print(f"Available columns in DataFrame: {relation.df.columns}")
+            print(f"Available columns in DataFrame: {relation.encoded.columns}")
 
-            # Create a new DataFrame for the leftover relation
-            new_df = relation.df[list(new_relation_attr)].copy()
+            # Project the data lazily for the leftover relation
+            new_df = relation.project(new_relation_attr)
 
             # Create the leftover relation
             leftover_relation = Relation(
@@ -142,7 +139,7 @@ class FourNF:
                 pk=deepcopy(relation.pk),
                 cks=deepcopy(new_cks),
                 MvalAttr=set(),  # No multivalued attributes
-                df=new_df.copy(),
+                df=new_df,
                 original=relation,  # Keep a reference to the original relation
                 base_relation=relation.base_relation  # Keep a reference to the base relation
             )
@@ -0,0 +1,108 @@
+import numpy as np
+from ColumnEncoding import as_encoded, group_ids
+from Partitions import PartitionCache
+
+class JoinDependencyChecker:
+    """
+    Decide join dependencies *[R1, ..., Rk] on a dictionary-encoded relation.
+    The relation is encoded and deduplicated once; every component is a distinct projection of
+    the int32 codes, read off the deduplicated table's PartitionCache. Join sizes are predicted from per-key degree counts, so the last join is
+    never materialized, and for acyclic components the search gives up as soon as a partial
+    join grows past |r|.
+    """
+    def __init__(self, df):
+        self.columns = list(df.columns)
+        table = as_encoded(df)
+        # Keep one representative per distinct row: the relation is compared as a set of tuples
+        self.table = table.drop_duplicates()
+        self.nrows = self.table.nrows
+        self.codes = self.table.codes
+        self.partitions = PartitionCache.of(self.table)
+        self.projections = {}
+
+    def project(self, component):
+        """ Distinct projection of the relation on a component, as a dict of code arrays. """
+        component = tuple(component)
+        if component not in self.projections:
+            representatives = self.partitions.get(component).representatives()
+            self.projections[component] = {col: self.codes[col][representatives] for col in component}
+        return self.projections[component]
+
+    @staticmethod
+    def join_order(components):
+        """
+        Order components so that each one meets the earlier ones inside a single earlier component
+        (running intersection), using GYO ear removal. Returns (order, is_acyclic); cyclic
+        components fall back to an order in which each component shares attributes with an earlier one.
+        """
+        edges = [frozenset(component) for component in components]
+        remaining = list(range(len(edges)))
+        removed = []
+        while len(remaining) > 1:
+            for e in remaining:
+                others = [f for f in remaining if f != e]
+                shared = edges[e] & frozenset().union(*(edges[f] for f in others))
+                if any(shared <= edges[f] for f in others):
+                    removed.append(e)
+                    remaining.remove(e)
+                    break
+            else:
+                break
+        if len(remaining) == 1:
+            return remaining + removed[::-1], True
+
+        order, covered = [0], set(edges[0])
+        pending = list(range(1, len(edges)))
+        while pending:
+            nxt = next((e for e in pending if edges[e] & covered), pending[0])
+            pending.remove(nxt)
+            order.append(nxt)
+            covered |= edges[nxt]
+        return order, False
+
+    def join_size(self, left, right, key):
+        """
+        Predict |left JOIN right| on the key columns from per-key degree counts.
+        Returns (size, left_keys, right_keys, right_degrees).
+        """
+        left_len = len(next(iter(left.values()))) if left else 0
+        right_len = len(next(iter(right.values()))) if right else 0
+        combined = [np.concatenate([left[col], right[col]]) for col in key]
+        key_ids, key_count = group_ids(combined, left_len + right_len)
+        left_keys, right_keys = key_ids[:left_len], key_ids[left_len:]
+        right_degrees = np.bincount(right_keys, minlength=key_count)
+        return int(right_degrees[left_keys].sum()), left_keys, right_keys, right_degrees
+
+    @staticmethod
+    def materialize_join(left, right, key, left_keys, right_keys, right_degrees):
+        """ Natural join of two code tables given their shared key ids. """
+        right_order = np.argsort(right_keys, kind="stable")
+        right_starts = np.cumsum(right_degrees) - right_degrees
+        counts = right_degrees[left_keys]
+        left_rows = np.repeat(np.arange(len(left_keys)), counts)
+        # Offset of every output row inside its key block on the right side
+        offsets = np.arange(len(left_rows)) - np.repeat(np.cumsum(counts) - counts, counts)
+        right_rows = right_order[right_starts[left_keys[left_rows]] + offsets]
+        joined = {col: codes[left_rows] for col, codes in left.items()}
+        joined.update({col: codes[right_rows] for col, codes in right.items() if col not in key})
+        return joined
+
+    def holds(self, components):
+        """
+        Return True if the relation equals the join of its projections on the components.
+        The join always contains the relation, so equal cardinality means equal sets.
+        """
+        if set().union(*components) != set(self.columns):
+            return False
+        order, acyclic = self.join_order(components)
+        running = self.project(components[order[0]])
+        for step, index in enumerate(order[1:], start=2):
+            right = self.project(components[index])
+            key = [col for col in right if col in running]
+            size, left_keys, right_keys, right_degrees = self.join_size(running, right, key)
+            if step == len(order):
+                return size == self.nrows
+            if acyclic and size > self.nrows:
+                return False
+            running = self.materialize_join(running, right, key, left_keys, right_keys, right_degrees)
+        return len(next(iter(running.values()))) == self.nrows
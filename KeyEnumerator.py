@@ -0,0 +1,63 @@
+from ClosureEngine import ClosureEngine
+
+class KeyEnumerator:
+    """
+    Enumerate all candidate keys of a schema under a set of FDs (Lucchesi-Osborn).
+    Starting from one key, every FD X -> Y turns a known key K into the superkey X + (K - Y);
+    minimizing it gives a key, and new keys are expanded the same way until none appear. The
+    work is polynomial in the number of keys found. Attributes that appear on no right-hand side
+    (the core) belong to every key, so they are never tried for removal, and when the core alone
+    is a superkey it is the only key.
+    """
+    def __init__(self, universe, attributes, fds):
+        """ fds is an iterable of (lhs, rhs) attribute collections; FDs reaching outside the schema are ignored. """
+        self.universe = universe
+        self.full = universe.mask(attributes)
+        self.fds = []
+        for lhs, rhs in fds:
+            lhs_mask = universe.mask(lhs)
+            rhs_mask = universe.mask({rhs} if isinstance(rhs, str) else rhs) & self.full & ~lhs_mask
+            if lhs_mask & ~self.full == 0 and rhs_mask:
+                self.fds.append((lhs_mask, rhs_mask))
+        self.engine = ClosureEngine.from_masks(universe, self.fds)
+        determined = 0
+        for _, rhs_mask in self.fds:
+            determined |= rhs_mask
+        self.core = self.full & ~determined
+
+    def is_superkey(self, mask):
+        return self.engine.closure(mask) & self.full == self.full
+
+    def minimize(self, mask):
+        """ Drop attributes from a superkey while it stays a superkey. """
+        for position in ClosureEngine.positions(mask & ~self.core):
+            smaller = mask & ~(1 << position)
+            if self.is_superkey(smaller):
+                mask = smaller
+        return mask
+
+    def key_masks(self):
+        """ Bitmasks of all candidate keys, in discovery order. """
+        if self.is_superkey(self.core):
+            return [self.core]
+        first = self.minimize(self.full)
+        keys = [first]
+        # Known keys bucketed by their lowest attribute: a key inside a superkey S has its lowest bit in S
+        buckets = {(first & -first).bit_length(): [first]}
+        for key in keys:  # keys grows while it is walked
+            for lhs_mask, rhs_mask in self.fds:
+                if not rhs_mask & key:
+                    continue  # X + (K - Y) would contain K itself
+                superkey = lhs_mask | (key & ~rhs_mask)
+                if any(known & ~superkey == 0 for position in ClosureEngine.positions(superkey)
+                       for known in buckets.get(position + 1, ())):
+                    continue
+                new_key = self.minimize(superkey)
+                keys.append(new_key)
+                buckets.setdefault((new_key & -new_key).bit_length(), []).append(new_key)
+        return keys
+
+    def keys(self):
+        """ All candidate keys as sets, smallest first (ties broken by attribute names). """
+        keys = [self.universe.names_of(mask) for mask in self.key_masks()]
+        return sorted(keys, key=lambda key: (len(key), sorted(map(str, key))))
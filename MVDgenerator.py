@@ -1,11 +1,15 @@
+import hashlib
 import pandas as pd
+from collections import OrderedDict
 from itertools import combinations
-from collections import defaultdict
+from ColumnEncoding import EncodedTable
+from MVDvalidator import MVDvalidator
 
 class MVDgenerator:
     def __init__(self, df,attributes):
         self.df = df
         self.attributes = attributes
+        self.validator = MVDvalidator(df)
 
     def is_trivial_mvd(self, determinant, dependent_set):
         """
@@ -17,77 +21,67 @@ class MVDgenerator:
             return True
         return False
 
+    def determined_attributes(self, determinant, candidates):
+        """
+        Return the candidate columns that are constant for each unique determinant value.
+        A column is constant inside every determinant group exactly when adding it to the
+        determinant leaves the partition error unchanged; the partitions come from the shared
+        cache, built by intersecting the cached determinant partition with the column's.
+        """
+        partitions = self.validator.partitions
+        error = partitions.get(determinant).error
+        return {col for col in candidates if partitions.get(set(determinant) | {col}).error == error}
+
     def remove_unnecessary_attributes(self, df, determinant):
         """
         Group by the determinant and remove attributes that are constant for each unique determinant value.
         """
-        grouped_df = df.groupby(list(determinant))
-        removable_columns = []
-        
-        for col in df.columns:
-            if col not in determinant:
-                # Check if column has the same value across all groups
-                unique_values = grouped_df[col].nunique()
-                if unique_values.eq(1).all():
-                    removable_columns.append(col)
-        
-        # Drop the removable columns from the DataFrame
-        reduced_df = df.drop(columns=removable_columns)
-        return reduced_df
+        removable_columns = self.determined_attributes(determinant, [col for col in df.columns if col not in determinant])
+        return df.drop(columns=[col for col in df.columns if col in removable_columns])
 
     def validate_each_mvd(self, determinant, dependent_sets):
         """
-        Validate MVDs using the provided method.
+        Validate MVDs using the shared grouped-count engine.
         """
-        determinant_columns = list(determinant)
         dependent1_columns, dependent2_columns = dependent_sets
-        dependent1_columns = list(dependent1_columns)
-        dependent2_columns = list(dependent2_columns)
-
-        # Sort the DataFrame by determinant, dependent set 1, and then dependent set 2
-        sorted_df = self.df.sort_values(by=determinant_columns + dependent1_columns + dependent2_columns)
-
-        # Initialize storage for the sets of dependent set 2 values
-        value_map = defaultdict(lambda: defaultdict(set))
-
-        # Collect sets of dependent set 2 values for each unique determinant and dependent set 1 combination
-        for _, row in sorted_df.iterrows():
-            key = tuple(row[col] for col in determinant_columns)
-            dep1_tuple = tuple(row[col] for col in dependent1_columns)
-            dep2_value = tuple(row[col] for col in dependent2_columns)
-
-            # Store the values in a set for comparison
-            value_map[key][dep1_tuple].add(dep2_value)
-
-        # Validate the sets
-        for key, dep1_map in value_map.items():
-            # For each dependent set 1 combination, check if all dependent set 2 sets are the same
-            reference_set = None
-            for dep1_tuple, dep2_set in dep1_map.items():
-                if reference_set is None:
-                    reference_set = dep2_set
-                elif reference_set != dep2_set:
-                    print(f"MVD condition violated for determinant '{key}', dependent set 1 '{dep1_tuple}'")
-                    return False
-
-        print("All MVD conditions hold.")
-        return True 
+        return self.validator.holds(determinant, dependent1_columns, dependent2_columns)
 
     def find_and_validate_all_mvds(self):
         """
         Generate and validate all possible non-trivial MVDs X ->-> Y | Z.
+        The determinant lattice is searched level by level:
+        - columns determined by a subset of X are determined by X as well, so only the rest are grouped,
+        - Y | Z and Z | Y are the same MVD and are validated once,
+        - if X - {A} ->-> Y | Z holds, then X ->-> Y' | Z' holds for every Y' within Y and Z' within Z
+          (augmentation), so such splits are accepted without looking at the data.
         """
         mvds = []
-        
+        columns = list(self.df.columns)
+        determined = {}  # frozenset(determinant) -> columns constant within each determinant group
+        holding = {}  # frozenset(determinant) -> [(Y, Z)] splits known to hold
+        validations = 0
+
         # Generate all possible determinants
         for k in range(1, len(self.attributes)):  # Loop over subset sizes for determinant
             for determinant in combinations(self.attributes, k):
                 determinant = set(determinant)
-                
-                # Reduce the DataFrame by removing unnecessary attributes based on the current determinant
-                reduced_df = self.remove_unnecessary_attributes(self.df, determinant)
-                remaining_attributes = set(reduced_df.columns) - determinant
-                
+                determinant_key = frozenset(determinant)
+                parents = [determinant_key - {attr} for attr in determinant_key] if k > 1 else []
+
+                # Inherit determined columns from the level below and only group the rest
+                inherited = set().union(*(determined.get(parent, set()) for parent in parents)) - determinant
+                unknown = [col for col in columns if col not in determinant and col not in inherited]
+                removable = inherited | (self.determined_attributes(determinant, unknown) if unknown else set())
+                determined[determinant_key] = removable
+
+                remaining_attributes = set(col for col in columns if col not in removable) - determinant
+                if len(remaining_attributes) < 2:
+                    continue
+
+                implied_splits = [split for parent in parents for split in holding.get(parent, [])]
+                checked = {}  # frozenset({Y, Z}) -> result, so each complementary pair is validated once
+                holding[determinant_key] = []
+
                 # Generate possible (Y, Z) splits for remaining attributes
                 for i in range(1, len(remaining_attributes)):
                     for dependent1 in combinations(remaining_attributes, i):
@@ -98,13 +92,75 @@ class MVDgenerator:
                         if self.is_trivial_mvd(determinant, dependent1) or self.is_trivial_mvd(determinant, dependent2):
                             print(f"Trivial MVD skipped: {determinant} ->-> {dependent1} | {dependent2}")
                             continue
-                        
+
+                        pair = frozenset((frozenset(dependent1), frozenset(dependent2)))
+                        if pair not in checked:
+                            if any((dependent1 <= y and dependent2 <= z) or (dependent1 <= z and dependent2 <= y)
+                                   for y, z in implied_splits):
+                                checked[pair] = True
+                            else:
+                                validations += 1
+                                checked[pair] = self.validate_each_mvd(determinant, (dependent1, dependent2))
+                            if checked[pair]:
+                                holding[determinant_key].append((frozenset(dependent1), frozenset(dependent2)))
+
                         # Validate the MVD
-                        if self.validate_each_mvd(determinant, (dependent1, dependent2)):
+                        if checked[pair]:
                             print(f"Non-trivial MVD holds: {determinant} ->-> {dependent1} | {dependent2}")
                             mvds.append((determinant, dependent1, dependent2))
-        
+
+        print(f"MVD search finished after {validations} validations.")
+        print(f"Partition cache: {self.validator.partitions.stats()}")
         if not mvds:
             print("No non-trivial MVDs found.")
         return mvds
 
+
+class MVDDiscoveryCache:
+    """
+    LRU cache of find_and_validate_all_mvds results keyed by a fingerprint of the
+    DataFrame content and the attribute set, so repeated 4NF checks on an unchanged
+    relation are a dictionary lookup.
+    """
+    def __init__(self, maxsize=128):
+        self.maxsize = maxsize
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def fingerprint(df, attributes):
+        """ Hash the column names, the row values (in order) and the attribute set. """
+        if isinstance(df, EncodedTable):
+            return df.fingerprint(), frozenset(attributes)
+        digest = hashlib.sha1()
+        digest.update(repr(list(df.columns)).encode())
+        digest.update(pd.util.hash_pandas_object(df, index=False).to_numpy().tobytes())
+        return digest.hexdigest(), frozenset(attributes)
+
+    def find_and_validate_all_mvds(self, df, attributes):
+        """
+        Return the non-trivial MVDs of df, running the discovery only on a cache miss.
+        Each call gets its own copies of the sets, so callers may modify them freely.
+        """
+        key = self.fingerprint(df, attributes)
+        if key in self.entries:
+            self.hits += 1
+            self.entries.move_to_end(key)
+            print(f"MVD discovery cache hit ({self.hits} hits, {self.misses} misses).")
+        else:
+            self.misses += 1
+            mvds = MVDgenerator(df, attributes).find_and_validate_all_mvds()
+            self.entries[key] = [(frozenset(det), frozenset(dep1), frozenset(dep2)) for det, dep1, dep2 in mvds]
+            if len(self.entries) > self.maxsize:
+                self.entries.popitem(last=False)
+        return [(set(det), set(dep1), set(dep2)) for det, dep1, dep2 in self.entries[key]]
+
+    def clear(self):
+        """ Drop all cached results and reset the counters. """
+        self.entries.clear()
+        self.hits = 0
+        self.misses = 0
+
+
+mvd_discovery_cache = MVDDiscoveryCache()
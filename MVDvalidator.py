@@ -0,0 +1,65 @@
+import numpy as np
+from ColumnEncoding import as_encoded
+from Partitions import PartitionCache
+
+class MVDvalidator:
+    """
+    Shared engine for deciding X ->-> Y | Z on a DataFrame.
+    Columns are dictionary-encoded once, and each candidate is decided with grouped
+    distinct counts: the MVD holds iff |pi XYZ| = |pi XY| * |pi XZ| / |pi X| inside every X group.
+    Groupings come from the table's PartitionCache, so they are shared with the other searches.
+    """
+    def __init__(self, df):
+        self.df = as_encoded(df)
+        self.nrows = len(df)
+        self.partitions = PartitionCache.of(self.df)
+
+    def group_ids(self, columns):
+        """ Dense group id per row for the given columns. """
+        return self.partitions.group_ids(columns)
+
+    @staticmethod
+    def distinct_per_group(parent_ids, parent_count, child):
+        """
+        Count, for every parent group, how many child groups it contains.
+        The child grouping must refine the parent grouping.
+        """
+        child_ids, child_count = child
+        parent_of_child = np.empty(child_count, dtype=np.int64)
+        parent_of_child[child_ids] = parent_ids
+        return np.bincount(parent_of_child, minlength=parent_count)
+
+    def holds(self, determinant, dependent1, dependent2):
+        """
+        Return True if determinant ->-> dependent1 | dependent2 holds in the data.
+        """
+        if self.nrows == 0:
+            print("All MVD conditions hold.")
+            return True
+
+        x = self.group_ids(determinant)
+        xy = self.group_ids(set(determinant) | set(dependent1))
+        xz = self.group_ids(set(determinant) | set(dependent2))
+        xyz = self.group_ids(set(determinant) | set(dependent1) | set(dependent2))
+
+        y_count = self.distinct_per_group(x[0], x[1], xy)
+        z_count = self.distinct_per_group(x[0], x[1], xz)
+        yz_count = self.distinct_per_group(x[0], x[1], xyz)
+
+        violated = np.flatnonzero(yz_count != y_count * z_count)
+        if len(violated):
+            row = int(np.flatnonzero(x[0] == violated[0])[0])
+            key = tuple(self.df.value(col, row) for col in determinant)
+            print(f"MVD condition violated for determinant '{key}'")
+            return False
+
+        print("All MVD conditions hold.")
+        return True
+
+    @staticmethod
+    def validate(df, determinant, dependent_sets):
+        """
+        One-shot validation of determinant ->-> Y | Z where dependent_sets is (Y, Z).
+        """
+        dependent1, dependent2 = dependent_sets
+        return MVDvalidator(df).holds(determinant, dependent1, dependent2)
@@ -0,0 +1,41 @@
+from ClosureEngine import ClosureEngine
+
+class MinimalCover:
+    """
+    Minimal (canonical) cover of a set of FDs on attribute bitmasks:
+    right-hand sides are split into single attributes, extraneous left-hand attributes are
+    dropped, FDs implied by the others are removed, and the survivors are merged back by
+    left-hand side. FDs keep the order in which their left-hand sides first appear.
+    """
+    @staticmethod
+    def compute(universe, fds):
+        """ fds is an iterable of (lhs, rhs) attribute collections; returns [(lhs_mask, rhs_mask)]. """
+        singles = []
+        for lhs, rhs in fds:
+            lhs_mask = universe.mask(lhs)
+            for position in ClosureEngine.positions(universe.mask({rhs} if isinstance(rhs, str) else rhs) & ~lhs_mask):
+                singles.append((lhs_mask, 1 << position))
+
+        # Dropping an extraneous attribute keeps the FD set equivalent, so one engine serves every test
+        engine = ClosureEngine.from_masks(universe, singles)
+        reduced = []
+        for lhs_mask, rhs_bit in singles:
+            for position in ClosureEngine.positions(lhs_mask):
+                smaller = lhs_mask & ~(1 << position)
+                if engine.closure(smaller) & rhs_bit:
+                    lhs_mask = smaller
+            reduced.append((lhs_mask, rhs_bit))
+
+        # Remove FDs implied by the ones that remain
+        engine = ClosureEngine.from_masks(universe, reduced)
+        removed = set()
+        for index, (lhs_mask, rhs_bit) in enumerate(reduced):
+            removed.add(index)
+            if not engine.closure(lhs_mask, excluded=removed) & rhs_bit:
+                removed.discard(index)
+
+        merged = {}
+        for index, (lhs_mask, rhs_bit) in enumerate(reduced):
+            if index not in removed:
+                merged[lhs_mask] = merged.get(lhs_mask, 0) | rhs_bit
+        return list(merged.items())
@@ -5,16 +5,108 @@ from BCNF import BCNF
 from FourNF import FourNF
 from FiveNF import FiveNF
 from Relation import Relation
-from itertools import combinations
+from FDgenerator import FDgenerator
+from UCCgenerator import UCCgenerator
+from FDvalidator import FDvalidator
+from AttributeUniverse import AttributeUniverse
+from ClosureEngine import ClosureEngine
+from ResultCache import ResultCache
+from copy import copy
+from pickle import PicklingError
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+# Base relation and strategies of the run, installed once per worker process
+_worker_base_relation = None
+_worker_manager = None
+
+def _init_normalization_worker(base_relation, three_nf_mode, bcnf_mode):
+    global _worker_base_relation, _worker_manager
+    _worker_base_relation = base_relation
+    _worker_manager = NormalizationManager([], "1NF", three_nf_mode, bcnf_mode)
+
+def _check_relation_in_worker(task):
+    """ Return None if the relation is in the normal form, otherwise its decomposition without links. """
+    nf_class, relation = task
+    relation.base_relation = _worker_base_relation
+    if nf_class.isin(relation):
+        return None
+    normalized_relations = _worker_manager.normalise_relation(nf_class, relation)
+    for nr in normalized_relations:
+        # The parent process rebuilds the links to its own objects
+        nr.base_relation = None
+        nr.original = None
+    return normalized_relations
 
 class NormalizationManager:
-    def __init__(self, relations: list[Relation], normalization_level: str):
+    # How 3NF is reached: "decomposition" splits violating FDs off (ThreeNF.normalise),
+    # "synthesis" builds the schema from the minimal cover in one pass (ThreeNF.synthesise)
+    THREE_NF_MODES = ("decomposition", "synthesis")
+    # How BCNF is reached: "decomposition" peels violating FDs off (BCNF.normalise),
+    # "polynomial" runs the closure-driven decomposition (BCNF.decompose_polynomial)
+    BCNF_MODES = ("decomposition", "polynomial")
+
+    def __init__(self, relations: list[Relation], normalization_level: str, three_nf_mode="decomposition",
+                 bcnf_mode="decomposition", discover_fds=False, check_keys=False, verify_dependencies=False,
+                 workers=1, cache_dir=None):
+        """
+        discover_fds: add the FDs found in each relation's data (FDgenerator) to its declared ones
+        before normalizing, for inputs whose FDs were not written out by hand.
+        check_keys: report the keys found in each relation's data (UCCgenerator) and flag the
+        declared primary and candidate keys the data does not support; see unsupported_keys.
+        verify_dependencies: check the declared FDs of each relation against its data
+        (FDvalidator) and raise ValueError on a violation, before any normalization work.
+        workers: number of processes checking and decomposing the relations of a level, and of
+        the 5NF partition search for a relation checked in this process; 1 keeps normalization
+        serial.
+        cache_dir: directory of a ResultCache; a run on the same input relations, level and options
+        as an earlier one returns the stored relations and schema text instead of normalizing again.
+        """
+        if three_nf_mode not in self.THREE_NF_MODES:
+            raise ValueError(f"Unknown 3NF mode {three_nf_mode!r}, expected one of {self.THREE_NF_MODES}")
+        if bcnf_mode not in self.BCNF_MODES:
+            raise ValueError(f"Unknown BCNF mode {bcnf_mode!r}, expected one of {self.BCNF_MODES}")
         self.relations = relations
         self.normalization_level = normalization_level
+        self.three_nf_mode = three_nf_mode
+        self.bcnf_mode = bcnf_mode
+        self.workers = workers
+        # Keyed on the relations as given, before discovery adds to them; a stored run already
+        # did the discovery and checks these options ask for, so a hit skips them
+        self.result_cache = ResultCache(cache_dir) if cache_dir is not None else None
+        self.cached_result = None
+        if self.result_cache is not None:
+            options = {"three_nf_mode": three_nf_mode, "bcnf_mode": bcnf_mode, "discover_fds": discover_fds,
+                       "check_keys": check_keys, "verify_dependencies": verify_dependencies}
+            self.cache_key = ResultCache.key(relations, normalization_level, options)
+            self.cached_result = self.result_cache.load(self.cache_key)
+        self.unsupported_keys = {}  # tablename -> declared keys that are not unique in the data
+        if self.cached_result is not None:
+            self.unsupported_keys = self.cached_result[2].get("unsupported_keys", {})
+        else:
+            if discover_fds:
+                for relation in relations:
+                    FDgenerator.discover(relation)
+            if verify_dependencies:
+                for relation in relations:
+                    violations = FDvalidator.verify(relation)
+                    if violations:
+                        raise ValueError(f"Relation {relation.tablename} violates {len(violations)} declared FDs, "
+                                         f"e.g. {FDvalidator(relation.encoded).describe(violations[0])}")
+            if check_keys:
+                for relation in relations:
+                    _, unsupported = UCCgenerator.check_keys(relation)
+                    if unsupported:
+                        print(f"Warning: relation {relation.tablename} declares keys its data does not support: {[set(key) for key in unsupported]}")
+                        self.unsupported_keys[relation.tablename] = unsupported
         self.normal_forms = [OneNF, TwoNF, ThreeNF, BCNF, FourNF, FiveNF]
         self.normal_form_names = ["1NF", "2NF", "3NF", "BCNF", "4NF", "5NF"]
         self.normal_form_map = {name: index for index, name in enumerate(self.normal_form_names)}
+        # Per level: passes of the stability loop, isin calls made and isin calls avoided
+        self.check_stats = {}
         self.base_relation = relations[0].copy() if relations else None  # Store a copied version of the first base relation
+        # Attribute bit positions shared by every relation derived from the base relation
+        self.universe = self.base_relation.universe if self.base_relation else AttributeUniverse()
 
     def normalize(self, output_file="normalized_schema.txt"):
      """
@@ -25,6 +117,15 @@ class NormalizationManager:
      required_level_index = self.normal_form_map[self.normalization_level]
      current_level_index = 0
 
+     if self.cached_result is not None:
+        self.relations, text, _ = self.cached_result
+        for relation in self.relations:
+            relation.adopt_universe(self.universe)
+        with open(output_file, "w") as file:
+            file.write(text)
+        print(f"Loaded the normalized relations from the result cache ({self.cache_key[:12]}), written to {output_file}.")
+        return self.relations
+
     # Clear existing content in the output file to start fresh
      open(output_file, "w").close()
 
@@ -35,21 +136,40 @@ class NormalizationManager:
         current_nf_class = self.normal_forms[current_level_index]
         current_nf_name = self.normal_form_names[current_level_index]
         stable = False
+        # Worklist: relations known to be in this normal form, id -> (relation, check signature);
+        # only relations that are new or changed since they passed are checked again
+        known = {}
+        stats = self.check_stats[current_nf_name] = {"passes": 0, "checks": 0, "avoided": 0}
 
         # Continue processing until no further changes are necessary
         while not stable:  # Stop renormalization if reaching 5NF
             stable = True
             new_relations = []
+            stats["passes"] += 1
+            to_check = []
             for relation in self.relations:
-                if not current_nf_class.isin(relation):
+                passed = known.get(id(relation))
+                if passed is not None and passed[0] is relation and passed[1] == relation.check_signature():
+                    stats["avoided"] += 1
+                else:
+                    to_check.append(relation)
+            stats["checks"] += len(to_check)
+            outcomes = dict(zip(map(id, to_check), self.check_relations(current_nf_class, to_check, base_relation)))
+
+            for relation in self.relations:
+                if id(relation) not in outcomes:
+                    new_relations.append(relation)
+                    continue
+                normalized_relations = outcomes[id(relation)]
+                if normalized_relations is not None:
                     stable = False  # Changes are needed, stability not yet reached
-                    normalized_relations = current_nf_class.normalise(relation)
                     # Attach the original relation reference to new relations
                     for nr in normalized_relations:
                         nr.base_relation = base_relation
                         nr.original = relation if not relation.original else relation.original
                     new_relations.extend(normalized_relations)
                 else:
+                    known[id(relation)] = (relation, relation.check_signature())
                     new_relations.append(relation)
 
             self.relations = new_relations  # Update relations to the newly processed list
@@ -57,6 +177,8 @@ class NormalizationManager:
                 break #Non need for renormalisation if it is 5NF
 
 
+        print(f"{current_nf_name}: {stats['checks']} checks, {stats['avoided']} avoided over {stats['passes']} passes.")
+
             # Output normalized relations to file after each stabilization attempt
         for relation in self.relations:
                 relation.generate_textual_representation(output_file, normalization_step=current_nf_name)
@@ -80,49 +202,111 @@ class NormalizationManager:
         normal_form = next(key for key, value in self.normal_form_map.items() if value == required_level_index)
         relation.generate_textual_representation(output_file, normalization_step=normal_form)
 
+     if self.result_cache is not None:
+        with open(output_file) as file:
+            self.result_cache.store(self.cache_key, self.relations, file.read(),
+                                    {"unsupported_keys": self.unsupported_keys})
+
      return self.relations
+    def check_relations(self, nf_class, relations, base_relation):
+        """
+        Check each relation against the normal form and normalise the ones that fail.
+        Returns, in the order of relations, None for a relation already in the normal form and
+        its decomposition otherwise. With more than one worker the relations are handled by a
+        process pool; the serial path is used for a single relation or when the pool fails, which
+        includes anything that cannot be pickled (PicklingError, or AttributeError and TypeError
+        for local objects). An error raised by the check itself is raised again by the serial path.
+        """
+        if self.workers > 1 and len(relations) > 1:
+            try:
+                return self.check_relations_in_pool(nf_class, relations, base_relation)
+            except (OSError, PicklingError, AttributeError, TypeError, BrokenProcessPool) as error:
+                print(f"Parallel normalization unavailable ({error}), continuing serially.")
+        return [None if self.is_in(nf_class, relation) else self.normalise_relation(nf_class, relation)
+                for relation in relations]
+
+    def check_relations_in_pool(self, nf_class, relations, base_relation):
+        """
+        Send the relations to worker processes, the base relation once per worker through the
+        initializer. Each relation travels without its base_relation and original links, and
+        the decompositions come back in input order with their bitmasks in the run's universe.
+        """
+        tasks = []
+        for relation in relations:
+            payload = copy(relation)
+            payload.universe = relation.universe
+            payload.base_relation = None
+            payload.original = None
+            tasks.append((nf_class, payload))
+        with ProcessPoolExecutor(max_workers=min(self.workers, len(relations)), initializer=_init_normalization_worker,
+                                 initargs=(base_relation, self.three_nf_mode, self.bcnf_mode)) as pool:
+            outcomes = list(pool.map(_check_relation_in_worker, tasks))
+        for normalized_relations in outcomes:
+            for nr in normalized_relations or []:
+                nr.adopt_universe(self.universe)
+        return outcomes
+
+    def is_in(self, nf_class, relation):
+        """ Check one relation against the normal form, with this run's workers for the 5NF partition search. """
+        if nf_class is FiveNF:
+            return FiveNF.isin(relation, self.workers)
+        return nf_class.isin(relation)
+
+    def normalise_relation(self, nf_class, relation):
+        """ Bring one relation to the given normal form using the strategy selected for this run. """
+        if nf_class is ThreeNF and self.three_nf_mode == "synthesis":
+            return ThreeNF.synthesise(relation)
+        if nf_class is BCNF and self.bcnf_mode == "polynomial":
+            return BCNF.decompose_polynomial(relation)
+        if nf_class is FiveNF:
+            return FiveNF.normalise(relation, self.workers)
+        return nf_class.normalise(relation)
+
     def clean_redundant_tables(self, curr_nf_name: str):
-        """ Clean tables that are redundant based on attribute sets. """
-        used_attrs_sets = []  # Track attribute sets already used
-        relations_to_remove = set()  # Relations that will be marked as redundant and removed
-
-        # First pass: collect attribute sets from all relations
-        print("Starting first pass to collect attribute sets from all relations...")
-        for index, relation in enumerate(self.relations):
-            relation_attrs = relation.attributes
-            print(f"Collecting attributes for relation {relation.tablename}: {relation_attrs}")
-            used_attrs_sets.append((index, relation, relation_attrs))  # Store index along with relation and attributes
-        print("Collected user attribute set", used_attrs_sets)
-
-        # Second pass: check for duplicate attribute sets using index matching
-        print("Starting second pass to check for duplicate attribute sets...")
-        for i, relation, relation_attrs in used_attrs_sets:
-            for j, _, used_attrs in used_attrs_sets:
-                if i != j and relation_attrs == used_attrs:
-                    if i > j:  # Only mark the relation with the higher index as redundant
-                        print(f"Marking redundant relation: {relation.tablename} with identical attributes (matched with relation at index {j}).")
-                        relations_to_remove.add(relation)
-                        break
-
-        # Third pass: mark leftover tables that are subsets of other relations' attributes
-        print("Starting third pass to mark leftover tables that are subsets of other relations...")
-        for relation in self.relations:
-            if relation.tablename.endswith(f"leftover_{curr_nf_name}"):
-                relation_attrs = relation.attributes
-                print("Leftover", relation_attrs)
-                for _, _, used_attrs in used_attrs_sets:
-                    if relation_attrs.issubset(used_attrs) and relation_attrs != used_attrs:
-                        print(f"Marking leftover relation as redundant: {relation.tablename} (subset of attributes: {used_attrs})")
-                        relations_to_remove.add(relation)
-                        break
-        
+        """
+        Clean tables that are redundant based on attribute sets:
+        - a relation with the same attributes as an earlier relation is removed,
+        - a leftover relation of this level whose attributes are a proper subset of another
+          relation's attributes (removed duplicates included) is removed.
+        Duplicates are found through a hash map of attribute bitmasks. Subsets are found through an
+        index from each attribute to the bitset of relations containing it: the relations containing
+        a leftover are the AND of its attributes' bitsets.
+        """
+        relations_to_remove = {}  # id -> relation, in marking order
+        masks = [self.universe.mask(relation.attributes) for relation in self.relations]
+        all_relations = (1 << len(masks)) - 1
 
-        # Remove the redundant relations
+        # Duplicates: the first relation with a given attribute set survives
+        first_with = {}  # attribute mask -> index of its first relation
+        same_attributes = {}  # attribute mask -> bitset of the relations with exactly these attributes
+        containing = {}  # attribute bit position -> bitset of the relations containing it
+        for index, (relation, mask) in enumerate(zip(self.relations, masks)):
+            same_attributes[mask] = same_attributes.get(mask, 0) | (1 << index)
+            for position in ClosureEngine.positions(mask):
+                containing[position] = containing.get(position, 0) | (1 << index)
+            if mask in first_with:
+                print(f"Marking redundant relation: {relation.tablename} with identical attributes (matched with relation at index {first_with[mask]}).")
+                relations_to_remove[id(relation)] = relation
+            else:
+                first_with[mask] = index
 
-        print(f"Relations marked for removal: {[relation.tablename for relation in relations_to_remove]}")
-        self.relations = [relation for relation in self.relations if relation not in relations_to_remove]
+        # Leftover tables that are a proper subset of another relation's attributes
+        for relation, mask in zip(self.relations, masks):
+            if relation.tablename.endswith(f"leftover_{curr_nf_name}") and id(relation) not in relations_to_remove:
+                supersets = all_relations
+                for position in ClosureEngine.positions(mask):
+                    supersets &= containing[position]
+                supersets &= ~same_attributes[mask]
+                if supersets:
+                    other = self.relations[(supersets & -supersets).bit_length() - 1]
+                    print(f"Marking leftover relation as redundant: {relation.tablename} (subset of attributes: {other.attributes})")
+                    relations_to_remove[id(relation)] = relation
+
+        # Remove the redundant relations
+        print(f"Relations marked for removal: {[relation.tablename for relation in relations_to_remove.values()]}")
+        self.relations = [relation for relation in self.relations if id(relation) not in relations_to_remove]
         print(f"Removed {len(relations_to_remove)} redundant relations.")
-        
+
     def assign_foreign_keys_with_priorities(self):
      """
     Assign foreign keys by prioritizing subsets based on primary key size,
@@ -131,53 +315,78 @@ class NormalizationManager:
     """
      print("Starting prioritized foreign key assignment...")
 
+     # Collect all primary and candidate keys once; assigning FKs does not change them
+     primary_and_candidate_keys = [
+        (index, other_relation, key_set)
+        for index, other_relation in enumerate(self.relations)
+        for key_set in [other_relation.pk] + other_relation.get_candidate_keys()
+     ]
+
+     # Sort based on priority: PK size, lexicographic PK, non-prime attr count, relation index
+     non_prime_counts = [len(other_relation.get_non_prime_attributes()) for other_relation in self.relations]
+     primary_and_candidate_keys.sort(key=lambda x: (
+        len(x[2]),                   # Primary key size
+        str(x[2]),                   # Lexicographic order of primary key
+        -non_prime_counts[x[0]],     # Descending order of non-prime attribute count
+        x[0]                         # Position in self.relations
+     ))
+
+     print("primary_and_candidate_keys:", primary_and_candidate_keys)
+
+     # Key sets as bitmasks, and an inverted index: attribute bit -> bitset of the positions (in priority
+     # order) of the keys containing it. The highest-priority key containing a subset is then the lowest
+     # bit of the AND of the index entries of its attributes.
+     key_masks = [self.universe.mask(key_set) for _, _, key_set in primary_and_candidate_keys]
+     keys_with = {}
+     for position, key_mask in enumerate(key_masks):
+        for bit in ClosureEngine.positions(key_mask):
+            keys_with[bit] = keys_with.get(bit, 0) | (1 << position)
+
      for relation in self.relations:
         assigned_foreign_keys = set()
+        attributes = list(relation.attributes)
+        bits = [self.universe.bit(attribute) for attribute in attributes]
+        order = {bit: position for position, bit in enumerate(bits)}
+        relation_mask = 0
+        probed_keys = 0
+        for bit in bits:
+            relation_mask |= 1 << bit
+            probed_keys |= keys_with.get(bit, 0)
 
-        # Collect all primary and candidate keys from other relations
-        primary_and_candidate_keys = [
-            (index, other_relation, key_set)
-            for index, other_relation in enumerate(self.relations)
-            for key_set in [other_relation.pk] + other_relation.get_candidate_keys()
-        ]
-
-        # Sort based on priority: PK size, lexicographic PK, non-prime attr count, relation index
-        primary_and_candidate_keys.sort(key=lambda x: (
-            len(x[2]),                   # Primary key size
-            str(x[2]),                   # Lexicographic order of primary key
-            -len(x[1].get_non_prime_attributes()),  # Descending order of non-prime attribute count
-            x[0]                         # Position in self.relations
-        ))
-
-        print("primary_and_candidate_keys:", primary_and_candidate_keys)
-
-        # Iterate over subsets of relation attributes in increasing size
-        for size in range(1, len(relation.attributes) + 1):
-            for subset in combinations(relation.attributes, size):
-                subset = frozenset(subset)
-
-                # Skip if any existing FK is a subset of the current subset
-                if any(fk['foreign_key'].issubset(subset) for fk in relation.foreign_keys):
-                    continue
+        # Only subsets of a key can match one: collect the subsets of each key's overlap with the relation
+        candidates = set()
+        for position in ClosureEngine.positions(probed_keys):
+            overlap = key_masks[position] & relation_mask
+            subset_mask = overlap
+            while subset_mask:
+                candidates.add(subset_mask)
+                subset_mask = (subset_mask - 1) & overlap
+
+        # Visit them like the subsets of the relation's attributes: by size, then in combination order
+        def enumeration_order(subset_mask):
+            positions = sorted(order[bit] for bit in ClosureEngine.positions(subset_mask))
+            return len(positions), positions
+
+        fk_masks = [self.universe.mask(fk['foreign_key']) for fk in relation.foreign_keys]
+        for subset_mask in sorted(candidates, key=enumeration_order):
+            # Skip if any existing FK is a subset of the current subset
+            if any(fk_mask & ~subset_mask == 0 for fk_mask in fk_masks):
+                continue
+
+            matching_keys = probed_keys
+            for bit in ClosureEngine.positions(subset_mask):
+                matching_keys &= keys_with[bit]
+            position = (matching_keys & -matching_keys).bit_length() - 1
+            _, other_relation, key_set = primary_and_candidate_keys[position]
 
-                # Process the sorted primary and candidate keys
-
-                for _, other_relation, key_set in primary_and_candidate_keys:
-                    if subset == key_set:
-                        # Exact match: Check if subset is not already covered by an FK
-                        if relation != other_relation:
-                            relation.add_fk(foreign_key=subset, references=(other_relation.tablename, key_set))
-                            assigned_foreign_keys.add(subset)
-                            print(f"Assigned FK (Exact Match): {subset} in {relation.tablename} -> {other_relation.tablename} referencing {key_set}")
-                        break  # Move to next subset if exact match is handled
-
-                    elif subset.issubset(key_set):
-                        # Subset match: Check if subset is not already covered by an FK
-                        if relation != other_relation:
-                            relation.add_fk(foreign_key=subset, references=(other_relation.tablename, key_set))
-                            assigned_foreign_keys.add(subset)
-                            print(f"Assigned FK (Subset Match): {subset} in {relation.tablename} -> {other_relation.tablename} referencing {key_set}")
-                        break  # Move to next subset if subset match is handled
+            # Exact or subset match: the subset becomes an FK unless it points back at this relation
+            if relation != other_relation:
+                subset = frozenset(attributes[position] for position in enumeration_order(subset_mask)[1])
+                relation.add_fk(foreign_key=subset, references=(other_relation.tablename, key_set))
+                assigned_foreign_keys.add(subset)
+                fk_masks.append(subset_mask)
+                match = "Exact Match" if subset_mask == key_masks[position] else "Subset Match"
+                print(f"Assigned FK ({match}): {subset} in {relation.tablename} -> {other_relation.tablename} referencing {key_set}")
 
 # Helper to ensure FK assignment rules
     def can_assign_fk(self, relation, other_relation, foreign_key_set):
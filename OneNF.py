@@ -1,5 +1,6 @@
-import pandas as pd
+import numpy as np
 from copy import deepcopy  # Use deepcopy to ensure we are copying data by value, not reference
+from ColumnEncoding import EncodedTable, encode_column
 from Relation import Relation
 
 class OneNF:
@@ -14,6 +15,39 @@ class OneNF:
             return False
         return True
 
+    @staticmethod
+    def split_multivalued(value):
+        """ Split a '{a, b, c}' cell into its stripped values; other cells are a single value. """
+        values = value.strip('{}').split(',') if isinstance(value, str) and '{' in value else [value]
+        return [value.strip() for value in values]
+
+    @staticmethod
+    def expand_multivalued(table: EncodedTable, pk_columns, mv_attr):
+        """
+        Build the (pk, mv_attr) table with one row per value of the multivalued attribute.
+        Each distinct cell is parsed once; rows are expanded with code arithmetic.
+        """
+        columns = pk_columns + [mv_attr]
+        if table.nrows == 0:
+            empty_codes = {col: np.empty(0, dtype=np.int32) for col in columns}
+            return EncodedTable(empty_codes, {col: np.empty(0, dtype=object) for col in columns}, columns, 0)
+
+        split_values = [OneNF.split_multivalued(value) for value in table.dictionaries[mv_attr]]
+        value_codes, value_dictionary = encode_column([value for values in split_values for value in values])
+        lengths = np.array([len(values) for values in split_values], dtype=np.int64)
+        starts = np.cumsum(lengths) - lengths
+
+        cell_codes = table.codes[mv_attr]
+        counts = lengths[cell_codes]
+        rows = np.repeat(np.arange(table.nrows), counts)
+        offsets = np.arange(len(rows)) - np.repeat(np.cumsum(counts) - counts, counts)
+
+        codes = {col: table.codes[col][rows] for col in pk_columns}
+        codes[mv_attr] = value_codes[starts[cell_codes[rows]] + offsets]
+        dictionaries = {col: table.dictionaries[col] for col in pk_columns}
+        dictionaries[mv_attr] = value_dictionary
+        return EncodedTable(codes, dictionaries, columns, len(rows))
+
     @staticmethod
     def normalise(relation: Relation):
         """
@@ -25,6 +59,7 @@ class OneNF:
         print("Normalizing to 1NF...")
         normalized_relations = []
         print("fds original map", relation.fd_map.items())
+        table = relation.encoded
 
         # Handle each multivalued attribute separately
         for mv_attr in relation.MvalAttr:
@@ -34,18 +69,8 @@ class OneNF:
             new_cks = []
             new_mval_attr = set()
 
-            normalized_data = []
-
-            for index, row in relation.df.iterrows():
-                mv_values = row[mv_attr].strip('{}').split(',') if isinstance(row[mv_attr], str) and '{' in row[mv_attr] else [row[mv_attr]]
-
-                for value in mv_values:
-                    value = value.strip()
-                    new_row = deepcopy(list(row[list(relation.pk)])) + [value]
-                    normalized_data.append(new_row)
-
-            new_columns = list(relation.pk) + [mv_attr]
-            new_df = pd.DataFrame(normalized_data, columns=new_columns)
+            # Split every distinct value once, then expand the rows through the codes
+            new_df = OneNF.expand_multivalued(table, list(relation.pk), mv_attr)
 
             new_relation = Relation(
                 tablename=new_relation_name,
@@ -53,7 +78,7 @@ class OneNF:
                 pk=new_pk,
                 cks=new_cks,
                 MvalAttr=new_mval_attr,
-                df=new_df.copy(),
+                df=new_df,
                 original=relation,
                 base_relation=relation.base_relation
             )
@@ -62,12 +87,7 @@ class OneNF:
 
             # Handle FDs: Transfer FDs that have the multivalued attribute as the dependent
             for fd_determinant, fd_dependents in deepcopy(relation.fd_map).items():
-                # Ensure fd_dependents is processed as a set of attributes
-                if isinstance(fd_dependents, str):
-                    fd_dependents = {fd_dependents}  # Convert to set if it's a single string
-                elif isinstance(fd_dependents, set) and len(fd_dependents) == 1 and isinstance(next(iter(fd_dependents)), str):
-                    # Split the only element if it represents multiple attributes
-                    fd_dependents = {attr.strip() for attr in next(iter(fd_dependents)).split(',')}
+                # fd_map stores dependents as sets of single attributes (see FDMap)
                 print("FD dependents:", fd_dependents)
                 
                 print("FD dependents:", len(fd_dependents))
@@ -92,7 +112,7 @@ class OneNF:
 
         # Handle leftover attributes (Primary Key + Non-Multivalued Attributes)
         leftover_attributes = relation.pk.union(relation.attributes - set(relation.MvalAttr))  # Fix: Convert MvalAttr to set
-        leftover_data = relation.df[list(leftover_attributes)].copy()
+        leftover_data = relation.project(leftover_attributes)
 
         # Create a new relation for the leftover attributes
         leftover_relation = Relation(
@@ -0,0 +1,185 @@
+import numpy as np
+from collections import OrderedDict
+from ColumnEncoding import densify
+
+
+class StrippedPartition:
+    """
+    Stripped partition (position list index) of the rows of a table by an attribute set.
+    Rows agreeing on the attributes form an equivalence class; classes of a single row are left
+    out, so a key has an empty partition. Rows are stored as one int array with a dense class
+    label per row (both int32), and the partition of X + Y is the product of the partitions of X
+    and Y, so the data is only scanned once per column.
+    """
+    def __init__(self, rows, labels, nclasses, nrows):
+        self.rows = rows  # positions of the rows in non-singleton classes, ascending
+        self.labels = labels  # class label (0..nclasses-1) of each of those rows
+        self.nclasses = nclasses
+        self.nrows = nrows
+
+    @classmethod
+    def from_labels(cls, rows, labels, nrows):
+        """ Partition of the given rows by label, dropping the classes of a single row. """
+        dense, nclasses = densify(labels)
+        counts = np.bincount(dense, minlength=nclasses)
+        keep = counts[dense] > 1
+        if not keep.all():
+            rows = rows[keep]
+            dense, nclasses = densify(dense[keep])
+        return cls(rows, dense.astype(np.int32), nclasses, nrows)
+
+    @classmethod
+    def from_codes(cls, codes):
+        """ Partition of one dictionary-encoded column. """
+        return cls.from_labels(np.arange(len(codes), dtype=np.int32), codes, len(codes))
+
+    @classmethod
+    def whole(cls, nrows):
+        """ Partition by the empty attribute set: all rows in one class. """
+        if nrows < 2:
+            return cls(np.empty(0, dtype=np.int32), np.empty(0, dtype=np.int32), 0, nrows)
+        return cls(np.arange(nrows, dtype=np.int32), np.zeros(nrows, dtype=np.int32), 1, nrows)
+
+    def __len__(self):
+        """ Number of rows in non-singleton classes. """
+        return len(self.rows)
+
+    @property
+    def error(self):
+        """
+        Rows to delete so that the attributes become a key: X -> A holds exactly when
+        the partitions of X and X + A have the same error.
+        """
+        return len(self.rows) - self.nclasses
+
+    def is_unique(self):
+        """ True if no two rows agree on the attributes. """
+        return self.nclasses == 0
+
+    @property
+    def nbytes(self):
+        return self.rows.nbytes + self.labels.nbytes
+
+    def product(self, other, scratch=None):
+        """
+        Partition by the union of both attribute sets: rows share a class when they share one in
+        both partitions. scratch is an int32 array of nrows filled with -1, reused across calls;
+        it is restored before returning, so the cost is O(len(self) + len(other)).
+        """
+        if scratch is None:
+            scratch = np.full(self.nrows, -1, dtype=np.int32)
+        scratch[other.rows] = other.labels
+        theirs = scratch[self.rows]
+        scratch[other.rows] = -1
+        keep = theirs >= 0
+        labels = self.labels[keep].astype(np.int64) * other.nclasses + theirs[keep]
+        return StrippedPartition.from_labels(self.rows[keep], labels, self.nrows)
+
+    def group_ids(self):
+        """ Dense group id per row, singleton rows included, as (ids, ngroups) like ColumnEncoding.group_ids. """
+        ids = np.full(self.nrows, -1, dtype=np.int64)
+        ids[self.rows] = self.labels
+        singletons = np.flatnonzero(ids < 0)
+        ids[singletons] = self.nclasses + np.arange(len(singletons))
+        return ids, self.nclasses + len(singletons)
+
+    def representatives(self):
+        """ Position of the first row of every class, singleton rows included, ascending. """
+        first = np.ones(self.nrows, dtype=bool)
+        first[self.rows] = False
+        first[self.rows[np.unique(self.labels, return_index=True)[1]]] = True
+        return np.flatnonzero(first)
+
+
+class PartitionCache:
+    """
+    Memory-bounded LRU cache of the stripped partitions of one EncodedTable by attribute set.
+    The discovery algorithms (FD and MVD search, MVD validation, join dependency checks) share
+    it through PartitionCache.of(table). A missing partition of X is the product of a cached
+    partition of X - {A} and the partition of A, so each column is scanned once and every other
+    partition is an intersection of cached ones. The least recently used partitions are evicted
+    once the cached arrays exceed max_bytes.
+    """
+    # Default memory budget per table, in bytes of cached row and label arrays
+    max_bytes = 256 * 1024 * 1024
+
+    def __init__(self, table, max_bytes=None):
+        self.table = table
+        self.max_bytes = PartitionCache.max_bytes if max_bytes is None else max_bytes
+        self.entries = OrderedDict()  # frozenset of columns -> StrippedPartition
+        self.nbytes = 0
+        self.peak_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.scratch = None
+
+    @staticmethod
+    def of(table):
+        """ The cache attached to an EncodedTable, created on first use. """
+        if table.partition_cache is None:
+            table.partition_cache = PartitionCache(table)
+        return table.partition_cache
+
+    def get(self, columns):
+        """ Stripped partition of the table by the given columns. """
+        key = frozenset(columns)
+        if not key:
+            return StrippedPartition.whole(self.table.nrows)
+        partition = self.entries.get(key)
+        if partition is not None:
+            self.hits += 1
+            self.entries.move_to_end(key)
+            return partition
+
+        missing = key.difference(self.table.columns)
+        if missing:
+            raise KeyError(f"{sorted(missing, key=str)} not in index")
+        self.misses += 1
+        ordered = [col for col in self.table.columns if col in key]
+        if len(ordered) == 1:
+            partition = StrippedPartition.from_codes(self.table.codes[ordered[0]])
+        else:
+            # Extend a cached subset one attribute smaller if there is one, otherwise peel off the last column
+            column = next((col for col in ordered if key - {col} in self.entries), ordered[-1])
+            partition = self.get(key - {column}).product(self.get([column]), self.scratch_array())
+        self.store(key, partition)
+        return partition
+
+    def group_ids(self, columns):
+        """ Dense group id per row for the given columns, see StrippedPartition.group_ids. """
+        return self.get(columns).group_ids()
+
+    def scratch_array(self):
+        if self.scratch is None:
+            self.scratch = np.full(self.table.nrows, -1, dtype=np.int32)
+        return self.scratch
+
+    def store(self, key, partition):
+        self.entries[key] = partition
+        self.nbytes += partition.nbytes
+        while self.nbytes > self.max_bytes and len(self.entries) > 1:
+            _, evicted = self.entries.popitem(last=False)
+            self.nbytes -= evicted.nbytes
+            self.evictions += 1
+        self.peak_bytes = max(self.peak_bytes, self.nbytes)
+
+    def stats(self):
+        """ Hit rate and memory use of the cache. """
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self.entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "evictions": self.evictions,
+            "bytes": self.nbytes,
+            "peak_bytes": self.peak_bytes,
+            "max_bytes": self.max_bytes,
+        }
+
+    def clear(self):
+        """ Drop all cached partitions and reset the counters. """
+        self.entries.clear()
+        self.nbytes = self.peak_bytes = 0
+        self.hits = self.misses = self.evictions = 0
@@ -1,5 +1,71 @@
-from collections import defaultdict
 from itertools import chain, combinations
+from AttributeUniverse import AttributeUniverse
+from ClosureEngine import ClosureEngine
+from KeyEnumerator import KeyEnumerator
+from MinimalCover import MinimalCover
+from ColumnEncoding import EncodedTable, Projection
+from MVDvalidator import MVDvalidator
+
+class FDMap(dict):
+    """
+    The fd_map dictionary, counting its own changes in version so that structures derived
+    from the FDs (closure engines, the minimal cover) know when they are stale.
+    Determinants and dependents are stored canonically: comma-joined names such as 'A, B'
+    are split into single attributes and a single str dependent becomes a set.
+    """
+    def __init__(self, *args, **kwargs):
+        super().__init__()
+        self.version = 0
+        for key, value in dict(*args, **kwargs).items():
+            self[key] = value
+
+    @staticmethod
+    def split_attributes(attributes):
+        """ Split comma-joined attribute names; the collection is returned as is when nothing needs splitting. """
+        if isinstance(attributes, str):
+            attributes = {attributes}
+        if not any(isinstance(attr, str) and ',' in attr for attr in attributes):
+            return attributes
+        split = {part.strip() for attr in attributes
+                 for part in (attr.split(',') if isinstance(attr, str) else [attr]) if part.strip()}
+        return frozenset(split) if isinstance(attributes, frozenset) else split
+
+    def touch(self):
+        self.version += 1
+
+    def __reduce__(self):
+        # Rebuild through __init__ so version exists before the items are set again
+        return (FDMap, (dict(self),), {"version": self.version})
+
+    def __setitem__(self, key, value):
+        super().__setitem__(frozenset(self.split_attributes(key)), self.split_attributes(value))
+        self.touch()
+
+    def __delitem__(self, key):
+        super().__delitem__(key)
+        self.touch()
+
+    def pop(self, *args):
+        self.touch()
+        return super().pop(*args)
+
+    def popitem(self):
+        self.touch()
+        return super().popitem()
+
+    def setdefault(self, key, default=None):
+        if key not in self:
+            self[key] = default
+        return self[key]
+
+    def update(self, *args, **kwargs):
+        for key, value in dict(*args, **kwargs).items():
+            self[key] = value
+
+    def clear(self):
+        super().clear()
+        self.touch()
+
 
 class Relation:
     def __init__(self, tablename, attributes, pk, cks=None, MvalAttr=None, df=None, original=None, base_relation=None):
@@ -8,14 +74,197 @@ class Relation:
         self.pk = pk if isinstance(pk, set) else set(pk)  # Ensure pk is stored as a set
         self.cks = cks if cks is not None else []  # Ensure cks is always a list of sets
         self.MvalAttr = MvalAttr
+        self._df = None  # Decoded DataFrame, built on first access to df
+        self._encoded = None  # Dictionary-encoded columns (EncodedTable)
+        self._projection = None  # Lazy projection of another relation's data, materialized on first read
         self.df = df
         self.fd_map = {}  # Functional Dependencies (FD) - Determinant -> Dependent
         self.mvd_map = {}  # Multivalued Dependencies (MVD) - Determinant -> List of dependent sets
         self.original = original
         self.base_relation = base_relation
         self.foreign_keys = []
+        self._mvd_validator = None
+        self._universe = None  # Attribute bit positions, shared with the base relation
+        self._closure_engines = {}  # use_keys -> (signature, ClosureEngine)
+        self._cover = None  # (signature, minimal cover of fd_map)
 
          # Store foreign keys as a list of dictionaries for easy tracking
+    @property
+    def fd_map(self):
+        """ Functional dependencies, determinant (frozenset) -> dependent set. """
+        return self._fd_map
+
+    @fd_map.setter
+    def fd_map(self, fds):
+        self._fd_map = fds if isinstance(fds, FDMap) else FDMap(fds)
+
+    @property
+    def df(self):
+        """
+        The relation's rows as a pandas DataFrame.
+        When the relation holds encoded data, the DataFrame is decoded on first access. The
+        DataFrame belongs to this relation alone, so changing it never affects shared data, and
+        as it may be changed in place, the encoded data is rebuilt from it on its next read.
+        """
+        if self._df is None and self.encoded is not None:
+            self._df = self._encoded.to_dataframe()
+        if self._df is not None:
+            self._mvd_validator = None
+            self._encoded, self._projection = None, None
+        return self._df
+
+    @df.setter
+    def df(self, data):
+        """ Accept a DataFrame, an EncodedTable or a lazy Projection as the relation's data. """
+        self._mvd_validator = None
+        self._df, self._encoded, self._projection = None, None, None
+        if isinstance(data, Projection):
+            self._projection = data
+        elif isinstance(data, EncodedTable):
+            self._encoded = data
+        else:
+            self._df = data
+
+    @property
+    def encoded(self):
+        """
+        The relation's rows as an EncodedTable (int32 codes plus a dictionary per column).
+        A relation created from a DataFrame is encoded once, and a projection is materialized
+        once, on first access.
+        """
+        if self._encoded is None:
+            if self._projection is not None:
+                self._encoded = self._projection.materialize()
+            elif self._df is not None:
+                self._encoded = EncodedTable.from_dataframe(self._df)
+        return self._encoded
+
+    def shared_data(self):
+        """
+        The relation's data in a form another relation can hold without copying: the lazy
+        projection if it has not been read yet, otherwise the read-only encoded columns.
+        """
+        if self._encoded is None and self._projection is not None:
+            return self._projection
+        return self.encoded
+
+    def project(self, attributes, distinct=True):
+        """
+        Lazy projection of the relation's data on the given attributes, or None without data.
+        Rows are only extracted (and deduplicated) when the relation holding it reads them.
+        """
+        source = self.shared_data()
+        if source is None:
+            return None
+        return Projection(source, list(attributes), distinct)
+
+    @property
+    def universe(self):
+        """
+        The AttributeUniverse used for this relation's bitmasks: the base relation's one when
+        there is a base relation, otherwise a new universe over the relation's own attributes.
+        """
+        if self._universe is None:
+            if self.base_relation is not None and self.base_relation is not self:
+                self._universe = self.base_relation.universe
+            else:
+                self._universe = AttributeUniverse(self.attributes)
+        return self._universe
+
+    @universe.setter
+    def universe(self, universe):
+        self._universe = universe
+
+    def adopt_universe(self, universe):
+        """ Switch to another AttributeUniverse, dropping everything cached as bitmasks of the old one. """
+        self._universe = universe
+        self._closure_engines = {}
+        self._cover = None
+
+    def mask(self, attributes):
+        """ Bitmask of an attribute collection in this relation's universe. """
+        return self.universe.mask(attributes)
+
+    def key_masks(self):
+        """ Bitmasks of the primary key followed by the candidate keys. """
+        return [self.mask(self.pk)] + [self.mask(ck) for ck in self.cks or []]
+
+    def contains_key(self, attributes_mask):
+        """ True if the attributes (as a bitmask) contain the primary key or a candidate key. """
+        return any(key & ~attributes_mask == 0 for key in self.key_masks())
+
+    def closure_engine(self, use_keys=False):
+        """
+        ClosureEngine over fd_map; with use_keys the primary and candidate keys also act as
+        FDs key -> all attributes. The engine (and its cached closures) is rebuilt only when the
+        FDs, or for use_keys the keys and attributes, have changed.
+        """
+        signature = self.fd_signature()
+        if use_keys:
+            signature += (tuple(self.key_masks()), self.mask(self.attributes))
+        cached = self._closure_engines.get(use_keys)
+        if cached is None or cached[0] != signature:
+            cached = self._closure_engines[use_keys] = (signature, ClosureEngine(self.universe, self.dependencies(use_keys)))
+        return cached[1]
+
+    def dependencies(self, use_keys=False):
+        """ The FDs as (lhs, rhs) pairs; with use_keys, plus key -> all attributes for the non-empty declared keys. """
+        fds = list(self.fd_map.items())
+        if use_keys:
+            fds += [(self.universe.names_of(key), self.attributes) for key in self.key_masks() if key]
+        return fds
+
+    def candidate_keys(self, use_keys=True):
+        """
+        Every candidate key of the relation implied by fd_map (and the declared keys with use_keys),
+        smallest first, enumerated with KeyEnumerator.
+        """
+        return KeyEnumerator(self.universe, self.attributes, self.dependencies(use_keys)).keys()
+
+    def fd_signature(self):
+        """ Changes whenever fd_map does. """
+        # Dependent sets can be shared between relations and grow in place, so their sizes are part of the signature
+        return (id(self.fd_map), self.fd_map.version, sum(len(dep) for dep in self.fd_map.values()))
+
+    def check_signature(self):
+        """
+        Changes whenever something a normal-form check reads changes: the name, attributes, keys,
+        FDs, MVDs, base relation or data. Used to skip re-checking a relation already known to pass.
+        """
+        return (self.tablename, self.mask(self.attributes), tuple(self.key_masks()), self.fd_signature(),
+                tuple((det, len(deps)) for det, deps in self.mvd_map.items()), id(self.base_relation),
+                id(self._df), id(self._encoded), id(self._projection))
+
+    def minimal_cover(self):
+        """ The minimal cover of fd_map as (lhs_mask, rhs_mask) pairs, recomputed only after fd_map changes. """
+        signature = self.fd_signature()
+        if self._cover is None or self._cover[0] != signature:
+            self._cover = (signature, MinimalCover.compute(self.universe, self.fd_map.items()))
+        return self._cover[1]
+
+    def cover_items(self):
+        """
+        The minimal cover of fd_map as (determinant frozenset, dependent set) pairs, for the
+        normal-form checks: no redundant FDs, no extraneous determinant attributes.
+        """
+        return [(frozenset(self.universe.names_of(lhs)), self.universe.names_of(rhs)) for lhs, rhs in self.minimal_cover()]
+
+    def closure_mask(self, attributes_mask, use_keys=False):
+        """ Bitmask of the closure of a bitmask of attributes under fd_map. """
+        return self.closure_engine(use_keys).closure(attributes_mask)
+
+    def closure(self, attributes, use_keys=False):
+        """ The closure X+ of a collection of attributes under fd_map, as a set. """
+        return self.universe.names_of(self.closure_mask(self.mask(attributes), use_keys))
+
+    def is_superkey(self, attributes):
+        """
+        True if the attributes contain a declared key or determine every attribute of the
+        relation through fd_map (keys implied by the FDs included).
+        """
+        mask = self.mask(attributes)
+        return self.contains_key(mask) or AttributeUniverse.is_subset(self.mask(self.attributes), self.closure_mask(mask, use_keys=True))
+
     def get_candidate_keys(self):
         """
     Return the candidate keys for this relation. Always return a list,
@@ -26,14 +275,20 @@ class Relation:
         """
         Add a Functional Dependency (FD) to the FD map.
         If the determinant_set already exists in the map, append the new dependent_set
-        to the existing one, rather than overwriting it.
+        to the existing one, rather than overwriting it. Comma-joined names are split, and an
+        FD already implied by the map is not stored again.
         """
         print(f"Adding FD: {determinant_set} --> {dependent_set}")
-        determinant_key = frozenset(determinant_set)
+        determinant_key = frozenset(FDMap.split_attributes(determinant_set))
+        dependent_set = FDMap.split_attributes(dependent_set)
+        if self.universe.is_subset(self.mask(dependent_set), self.closure_mask(self.mask(determinant_key))):
+            print(f"FD {determinant_set} --> {dependent_set} is implied by the existing FDs. Skipping.")
+            return
 
         if determinant_key in self.fd_map:
             print(f"Determinant {determinant_set} already exists. Appending {dependent_set} to current dependent set.")
             self.fd_map[determinant_key].update(dependent_set)
+            self.fd_map.touch()
         else:
             self.fd_map[determinant_key] = dependent_set
 
@@ -90,7 +345,7 @@ class Relation:
             pk=self.pk.copy(),  # Copy primary key as a set
             cks=[ck.copy() for ck in self.cks],  # Copy candidate keys as a list of sets
             MvalAttr=self.MvalAttr.copy(),  # Copy multivalued attributes
-            df=self.df.copy(),  # Copy the dataframe
+            df=self.shared_data(),  # Encoded columns are read-only and can be shared
             original=self.original,
             base_relation=self.base_relation
         )
@@ -103,6 +358,7 @@ class Relation:
 
         # Copy foreign keys
         new_relation.foreign_keys = [fk.copy() for fk in self.foreign_keys]
+        new_relation.universe = self.universe
 
         return new_relation
 
@@ -139,51 +395,31 @@ class Relation:
         if isinstance(self.attributes, list):
             self.attributes = set(self.attributes)
         
-        prime_attributes = set().union(*self.get_all_keys())  # Flatten all prime attributes into a set
-        non_prime_attributes = self.attributes - prime_attributes
-        return non_prime_attributes
+        prime_mask = 0
+        for key in self.key_masks():  # Flatten all prime attributes into one mask
+            prime_mask |= key
+        return self.universe.names_of(self.mask(self.attributes) & ~prime_mask)
     
     def validate_each_mvd(self, determinant, dependent_sets):
         """
-        Validate MVDs by sorting and collecting sets dynamically based on determinant and dependent sets.
+        Validate an MVD determinant ->-> Y | Z on the relation's data.
         
         Parameters:
         determinant (tuple): The determinant attributes.
         dependent_sets (list of tuples): List of tuples of dependent attributes.
         """
-        determinant_columns = list(determinant)
         dependent1_columns, dependent2_columns = dependent_sets
-        dependent1_columns = list(dependent1_columns)
-        dependent2_columns = list(dependent2_columns)
-
-        # Sort the DataFrame by determinant, dependent set 1, and then dependent set 2
-        sorted_df = self.df.sort_values(by=determinant_columns + dependent1_columns + dependent2_columns)
-
-        # Initialize storage for the sets of dependent set 2 values
-        value_map = defaultdict(lambda: defaultdict(set))
-
-        # Collect sets of dependent set 2 values for each unique determinant and dependent set 1 combination
-        for _, row in sorted_df.iterrows():
-            key = tuple(row[col] for col in determinant_columns)
-            dep1_tuple = tuple(row[col] for col in dependent1_columns)
-            dep2_value = tuple(row[col] for col in dependent2_columns)
-
-            # Store the values in a set for comparison
-            value_map[key][dep1_tuple].add(dep2_value)
-
-        # Validate the sets
-        for key, dep1_map in value_map.items():
-            # For each dependent set 1 combination, check if all dependent set 2 sets are the same
-            reference_set = None
-            for dep1_tuple, dep2_set in dep1_map.items():
-                if reference_set is None:
-                    reference_set = dep2_set
-                elif reference_set != dep2_set:
-                    print(f"MVD condition violated for determinant '{key}', dependent set 1 '{dep1_tuple}'")
-                    return False
-
-        print("All MVD conditions hold.")
-        return True
+
+        # Reuse the validator (and its groupings) until the data is replaced
+        if self._mvd_validator is None:
+            self._mvd_validator = MVDvalidator(self.encoded)
+        return self._mvd_validator.holds(determinant, dependent1_columns, dependent2_columns)
+
+    def __getstate__(self):
+        """ Pickle without the MVD validator, whose groupings are rebuilt on demand. """
+        state = self.__dict__.copy()
+        state["_mvd_validator"] = None
+        return state
 
 
 
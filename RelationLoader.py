@@ -0,0 +1,284 @@
+import os
+import pandas as pd
+from Relation import Relation
+from ColumnEncoding import EncodedTable, StreamingEncoder
+
+ROWEND = '-Rowend-'
+SIDECAR_SUFFIX = '.meta.txt'
+# Strings that pandas.read_excel reads as missing by default; the loaders turn them into ''
+NA_STRINGS = frozenset(['', '#N/A', '#N/A N/A', '#NA', '-1.#IND', '-1.#QNAN', '-NaN', '-nan', '1.#IND', '1.#QNAN',
+                        '<NA>', 'N/A', 'NA', 'NULL', 'NaN', 'None', 'n/a', 'nan', 'null'])
+
+def process_composite_key_array(cks_input):
+    print(f"Processing composite keys: {cks_input}")
+    composite_keys = []
+    if cks_input:  # Ensure there is input to process
+        for ck in cks_input.split('}'):
+            ck = ck.strip().strip(',{}')  # Strip outer braces and any trailing commas
+            if ck:  # Ensure non-empty strings are processed
+                cleaned_ck = {key.strip() for key in ck.split(',')}
+                if cleaned_ck:  # Avoid adding empty sets
+                    composite_keys.append(cleaned_ck)
+    print(f"Processed composite keys: {composite_keys}")
+    return composite_keys
+
+
+def process_fd_mvd_input(fd_mvd_input):
+    """
+    Process the input strings to identify Functional Dependencies (FDs) and Multivalued Dependencies (MVDs).
+    An FD is identified by '->', and an MVD is identified by '-->>'.
+    Ensure that each element in the sets is stripped of leading and trailing spaces.
+    """
+    fd_list = []
+    mvd_list = []
+
+    for line in fd_mvd_input:
+        line = line.strip()
+        if '-->>' in line:  # Multivalued Dependency
+            determinant, dependent = line.split('-->>')
+            # Strip spaces and process the determinant and dependent sets
+            determinant_set = set(elem.strip() for elem in determinant.strip().lstrip('{').rstrip('}').split(','))
+            # Create a single set containing all dependent elements across multiple subsets if applicable
+            dependent_elements = dependent.split('|')
+            combined_dependent_list= []
+            
+            for elem_group in dependent_elements:
+                elem_set = set(elem.strip() for elem in elem_group.strip().lstrip('{').rstrip('}').split(','))
+                combined_dependent_list.append(elem_set)  # Combine all elements into one set
+            mvd_list.append((determinant_set, combined_dependent_list))
+        elif '-->' in line:  # Functional Dependency
+            determinant, dependent = line.split('-->')
+            # Strip spaces and process the determinant and dependent sets
+            determinant_set = set(elem.strip() for elem in determinant.strip().lstrip('{').rstrip('}').split(','))
+            dependent_set = set(elem.strip() for elem in dependent.strip().lstrip('{').rstrip('}').split(','))
+            fd_list.append((determinant_set, dependent_set))
+
+    return fd_list, mvd_list
+
+def parse_metadata_block(lines):
+    """
+    Parse the lines that follow the data block: primary key, candidate keys,
+    multivalued attributes and then the FD/MVD lines.
+    Returns (primary_key, candidate_keys, multivalued_attributes, fds, mvds), or None when
+    there are not enough lines.
+    """
+    lines = ['' if line is None else line for line in lines]
+    if len(lines) < 3:
+        return None
+
+    primary_key = set(elem.strip() for elem in lines[0].strip('{} ').split(','))  # Trim keys properly
+    print(f"Primary Key (as a set): {primary_key}")
+
+    candidate_keys_input = lines[1]
+    print(f"Raw Candidate Keys: {candidate_keys_input}")
+    if candidate_keys_input.strip()=='None':
+        candidate_keys=[]
+    else:
+        candidate_keys = process_composite_key_array(candidate_keys_input)
+
+    multivalued_attributes = [mv.strip() for mv in lines[2].split(',')]
+    print(f"Multivalued Attributes: {multivalued_attributes}")
+
+    # Process FD and MVD information after the multivalued attributes
+    fds, mvds = process_fd_mvd_input(lines[3:])
+    return primary_key, candidate_keys, multivalued_attributes, fds, mvds
+
+def build_relation(table_name, attributes, data, metadata, normalization_level):
+    """ Create the base Relation from a parsed metadata block and an encoded data block. """
+    if metadata is None:
+        print("Not enough rows in the DataFrame to process primary key, candidate keys, or multivalued attributes.")
+        return None, None
+    primary_key, candidate_keys, multivalued_attributes, fds, mvds = metadata
+
+    # Creating the Relation object with FDs and MVDs; the data is dictionary-encoded once here
+    relation = Relation(table_name, attributes, primary_key, candidate_keys, multivalued_attributes, data)
+    relation.base_relation=relation
+
+    # Adding FDs to the relation
+    for fd in fds:
+        relation.add_fd(fd[0], fd[1])
+
+    # Adding MVDs to the relation
+    for mvd in mvds:
+        relation.add_mvd(mvd[0], mvd[1])
+
+    print(f"Relation object created with Normalization Level: {normalization_level}")
+    return relation, normalization_level
+
+def load_workbook_relation(file_path):
+    """
+    Load a relation from an Excel workbook in the input layout:
+    normalization level, table name, attribute row, data rows, '-Rowend-', primary key,
+    candidate keys, multivalued attributes and the FD/MVD lines.
+    The sheet is read once; the data and metadata blocks are both sliced from that read.
+    """
+    print(f"Reading Excel file from path: {file_path}")
+    sheet = pd.read_excel(file_path, header=None).fillna('')
+    print(f"File read successfully. DataFrame shape: {sheet.shape}")
+
+    normalization_level = sheet.iloc[0, 0]
+    print(f"Normalization Level: {normalization_level}")
+
+    # Find rows that contain '-Rowend-' in the first column
+    rowend_rows = sheet.index[sheet[0] == ROWEND].tolist()
+    print(f"Rows containing '-Rowend-': {rowend_rows}")
+    if not rowend_rows:
+        rowend_rows = [len(sheet)]  # Assume data continues to the last row of the file
+        print(f"No '-Rowend-' found. Assuming data continues till row: {len(sheet)}")
+
+    table_name = sheet.iloc[1, 0].strip()  # Ensure table name is stripped of spaces
+    print(f"Table Name: {table_name}")
+
+    header = list(sheet.iloc[2, :])
+    attributes = {attr.strip() for attr in header if isinstance(attr, str)}
+    print(f"Attributes: {attributes}")
+
+    # Data section: from the row after the attribute row up to the first '-Rowend-' row
+    columns = [name if name != '' else f"Unnamed: {position}" for position, name in enumerate(header)]
+    data = sheet.iloc[3:rowend_rows[0]].set_axis(columns, axis=1).reset_index(drop=True).infer_objects()
+    print(f"Data extracted. DataFrame shape: {data.shape}")
+
+    metadata = parse_metadata_block(sheet.iloc[rowend_rows[0] + 1:, 0].tolist())
+    return build_relation(table_name, attributes, EncodedTable.from_dataframe(data), metadata, normalization_level)
+
+def convert_cell(cell):
+    """
+    Convert a read-only worksheet cell the way the pandas Excel reader does after fillna(''):
+    empty and error cells become '', integral numbers become int.
+    """
+    from openpyxl.cell.cell import TYPE_ERROR, TYPE_NUMERIC
+
+    if cell.value is None or cell.data_type == TYPE_ERROR:
+        return ''
+    if cell.data_type == TYPE_NUMERIC:
+        value = int(cell.value)
+        return value if value == cell.value else float(cell.value)
+    return cell.value
+
+def stream_sheet_rows(file_path):
+    """
+    Yield the converted cells of the first worksheet row by row, with trailing empty cells
+    trimmed, missing-value strings blanked and trailing empty rows dropped.
+    Only one row is held in memory at a time.
+    """
+    from openpyxl import load_workbook
+
+    workbook = load_workbook(file_path, read_only=True, data_only=True, keep_links=False)
+    try:
+        sheet = workbook.worksheets[0]
+        sheet.reset_dimensions()
+        empty_rows = 0
+        for cells in sheet.rows:
+            row = [convert_cell(cell) for cell in cells]
+            while row and row[-1] == '':
+                row.pop()
+            row = ['' if isinstance(value, str) and value in NA_STRINGS else value for value in row]
+            if not row:
+                empty_rows += 1
+                continue
+            # Empty rows only count when something follows them
+            for _ in range(empty_rows):
+                yield []
+            empty_rows = 0
+            yield row
+    finally:
+        workbook.close()
+
+def load_workbook_streaming(file_path):
+    """
+    Load a relation from an .xlsx workbook in the input layout without building a DataFrame.
+    Rows are streamed from a read-only workbook and dictionary-encoded as they arrive, so
+    memory grows with the encoded data (one int32 per cell plus the distinct values) rather
+    than with the sheet. The data block ends at '-Rowend-'; after it only the first cell of
+    each row is kept for the metadata block.
+    """
+    print(f"Streaming Excel file from path: {file_path}")
+    rows = stream_sheet_rows(file_path)
+
+    first = next(rows, [])
+    normalization_level = first[0] if first else ''
+    print(f"Normalization Level: {normalization_level}")
+
+    second = next(rows, [])
+    table_name = (second[0] if second else '').strip()  # Ensure table name is stripped of spaces
+    print(f"Table Name: {table_name}")
+
+    header = next(rows, [])
+    columns = [name if name != '' else f"Unnamed: {position}" for position, name in enumerate(header)]
+    # The sheet is as wide as its widest row, so the first two rows may already add columns
+    columns += [f"Unnamed: {position}" for position in range(len(columns), max(len(first), len(second)))]
+    encoder = StreamingEncoder(columns)
+
+    def widen(row):
+        # A row wider than the sheet seen so far adds unnamed columns, as pandas would
+        for position in range(len(encoder.columns), len(row)):
+            encoder.add_column(f"Unnamed: {position}")
+
+    metadata_lines = None
+    for row in rows:
+        widen(row)
+        if metadata_lines is not None:
+            metadata_lines.append(row[0] if row else '')
+        elif row and row[0] == ROWEND:
+            metadata_lines = []
+        else:
+            encoder.append(row)
+    if metadata_lines is None:
+        print("No '-Rowend-' found. Assuming data continues till the last row of the file")
+        metadata_lines = []
+
+    # Header cells are padded to the final sheet width, like the pandas reader does
+    header = header + [''] * (len(encoder.columns) - len(header))
+    attributes = {attr.strip() for attr in header if isinstance(attr, str)}
+    print(f"Attributes: {attributes}")
+
+    data = encoder.finish()
+    print(f"Data extracted. Encoded shape: {data.shape}")
+    return build_relation(table_name, attributes, data, parse_metadata_block(metadata_lines), normalization_level)
+
+def read_sidecar(metadata_path):
+    """
+    Read a metadata sidecar: the workbook's first column without the attribute and data rows,
+    i.e. normalization level, table name, primary key, candidate keys, multivalued attributes
+    and then one FD/MVD per line.
+    """
+    with open(metadata_path) as file:
+        return [line.rstrip('\n') for line in file]
+
+def load_tabular_relation(file_path, metadata_path=None):
+    """
+    Load a relation whose data block is a CSV or Parquet file and whose metadata lives in a
+    sidecar text file (default: the data file name followed by '.meta.txt').
+    """
+    metadata_path = metadata_path or file_path + SIDECAR_SUFFIX
+    print(f"Reading data file {file_path} with metadata from {metadata_path}")
+    lines = read_sidecar(metadata_path)
+
+    if file_path.lower().endswith('.parquet'):
+        data = pd.read_parquet(file_path)
+    else:
+        data = pd.read_csv(file_path)
+    data = data.fillna('')
+    data.columns = [str(col).strip() for col in data.columns]  # Column names must match the stripped attributes
+    print(f"Data extracted. DataFrame shape: {data.shape}")
+
+    normalization_level = lines[0].strip()
+    table_name = lines[1].strip()
+    attributes = set(data.columns)
+    print(f"Normalization Level: {normalization_level}, Table Name: {table_name}, Attributes: {attributes}")
+
+    metadata = parse_metadata_block(lines[2:])
+    return build_relation(table_name, attributes, EncodedTable.from_dataframe(data), metadata, normalization_level)
+
+def load_relation(file_path, metadata_path=None, streaming=True):
+    """
+    Load a relation and its normalization level from an input file, reading the file once.
+    .xlsx/.xls workbooks carry their own metadata; .csv and .parquet data files take it from a sidecar.
+    .xlsx/.xlsm workbooks are streamed unless streaming is False; .xls always goes through pandas.
+    """
+    extension = os.path.splitext(file_path)[1].lower()
+    if extension in ('.csv', '.parquet'):
+        return load_tabular_relation(file_path, metadata_path)
+    if streaming and extension in ('.xlsx', '.xlsm'):
+        return load_workbook_streaming(file_path)
+    return load_workbook_relation(file_path)
@@ -0,0 +1,144 @@
+import hashlib
+import os
+import pickle
+from pickle import PicklingError, UnpicklingError
+
+
+class ResultCache:
+    """
+    Content-addressed on-disk cache of whole normalization runs.
+    An entry is keyed by a hash of the input relations (data fingerprint, attributes, keys, FDs,
+    MVDs and foreign keys), the target normal form, the options that change the result and
+    ENGINE_VERSION, and holds the normalized relations together with the text written to the
+    schema file and the run's other findings. Entries are pickle files named by their key in one
+    directory; the least recently used ones are deleted once the directory holds more than max_bytes.
+    """
+    # Part of every key: bump it whenever a change to the normalization alters its results
+    ENGINE_VERSION = 1
+    # Default size budget of the cache directory, in bytes of entry files
+    max_bytes = 1024 * 1024 * 1024
+    suffix = ".pkl"
+
+    def __init__(self, directory, max_bytes=None):
+        self.directory = directory
+        self.max_bytes = ResultCache.max_bytes if max_bytes is None else max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        os.makedirs(directory, exist_ok=True)
+
+    @staticmethod
+    def canonical(value):
+        """ Text form of a value that does not depend on set or dict iteration order. """
+        if isinstance(value, (set, frozenset)):
+            return "{" + ",".join(sorted(ResultCache.canonical(item) for item in value)) + "}"
+        if isinstance(value, dict):
+            return "{" + ",".join(sorted(f"{ResultCache.canonical(key)}:{ResultCache.canonical(item)}"
+                                         for key, item in value.items())) + "}"
+        if isinstance(value, (list, tuple)):
+            return "[" + ",".join(ResultCache.canonical(item) for item in value) + "]"
+        return repr(value)
+
+    @staticmethod
+    def key(relations, normalization_level, options=None):
+        """ Hex digest identifying a run on the given relations, target level and options. """
+        digest = hashlib.sha256()
+        digest.update(f"engine {ResultCache.ENGINE_VERSION}\nlevel {normalization_level}\n".encode())
+        digest.update(f"options {ResultCache.canonical(options or {})}\n".encode())
+        for relation in relations:
+            data = relation.encoded
+            description = [relation.tablename, relation.attributes, relation.pk, relation.cks, relation.MvalAttr,
+                           dict(relation.fd_map), relation.mvd_map, relation.foreign_keys,
+                           data.fingerprint() if data is not None else None]
+            digest.update(f"relation {ResultCache.canonical(description)}\n".encode())
+        return digest.hexdigest()
+
+    def path(self, key):
+        return os.path.join(self.directory, key + self.suffix)
+
+    def load(self, key):
+        """ The (relations, text, details) stored under key, or None on a miss. A damaged entry is deleted. """
+        path = self.path(key)
+        try:
+            with open(path, "rb") as file:
+                entry = pickle.load(file)
+        except FileNotFoundError:
+            self.misses += 1
+            return None
+        except (OSError, EOFError, UnpicklingError, AttributeError, ImportError) as error:
+            print(f"Discarding unreadable cache entry {path} ({error}).")
+            self.remove(path)
+            self.misses += 1
+            return None
+        self.hits += 1
+        os.utime(path)  # Mark it as recently used
+        return entry["relations"], entry["text"], entry.get("details", {})
+
+    def store(self, key, relations, text, details=None):
+        """
+        Write an entry and evict the least recently used ones beyond max_bytes. details is a dict
+        of whatever else the run reported, returned as is by load().
+        Returns False, leaving the cache as it was, when the relations cannot be pickled.
+        """
+        path = self.path(key)
+        temporary = f"{path}.{os.getpid()}.tmp"
+        try:
+            with open(temporary, "wb") as file:
+                entry = {"relations": relations, "text": text, "details": details or {}}
+                pickle.dump(entry, file, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(temporary, path)  # Readers only ever see complete entries
+        except (OSError, PicklingError, TypeError, AttributeError) as error:
+            print(f"Could not cache the normalization result ({error}).")
+            self.remove(temporary)
+            return False
+        self.evict(keep=path)
+        return True
+
+    def entries(self):
+        """ (last use, size, path) of every entry, least recently used first. """
+        entries = []
+        for entry in os.scandir(self.directory):
+            if entry.name.endswith(self.suffix) and entry.is_file():
+                status = entry.stat()
+                entries.append((status.st_mtime, status.st_size, entry.path))
+        return sorted(entries)
+
+    def evict(self, keep=None):
+        """ Delete the least recently used entries until the directory fits in max_bytes. """
+        entries = self.entries()
+        nbytes = sum(size for _, size, _ in entries)
+        for _, size, path in entries:
+            if nbytes <= self.max_bytes:
+                break
+            if path == keep:
+                continue
+            self.remove(path)
+            nbytes -= size
+            self.evictions += 1
+
+    @staticmethod
+    def remove(path):
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+    def stats(self):
+        """ Hit rate and disk use of the cache. """
+        lookups = self.hits + self.misses
+        entries = self.entries()
+        return {
+            "entries": len(entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "evictions": self.evictions,
+            "bytes": sum(size for _, size, _ in entries),
+            "max_bytes": self.max_bytes,
+        }
+
+    def clear(self):
+        """ Delete every entry and reset the counters. """
+        for _, _, path in self.entries():
+            self.remove(path)
+        self.hits = self.misses = self.evictions = 0
@@ -1,4 +1,6 @@
 from Relation import Relation
+from AttributeUniverse import AttributeUniverse
+from ClosureEngine import ClosureEngine
 from copy import deepcopy
 
 class ThreeNF:
@@ -12,8 +14,8 @@ class ThreeNF:
         - Y is a prime attribute (i.e., part of some candidate key).
         """
         print(f"Checking if the relation {relation.tablename} is in 3NF.")
-        # Iterate through functional dependencies (FDs) in the relation
-        for determinant, dependent in relation.fd_map.items():
+        # Iterate through the minimal cover of the relation's functional dependencies (FDs)
+        for determinant, dependent in relation.cover_items():
             # Check if the determinant (X) is a superkey
             if not ThreeNF.is_superkey(relation, determinant):
                 # If not a superkey, check if dependent (Y) is a prime attribute
@@ -27,18 +29,10 @@ class ThreeNF:
     @staticmethod
     def is_superkey(relation: Relation, determinant_set: frozenset) -> bool:
         """
-        Checks if the given determinant_set is a superkey (i.e., it contains the primary key or any candidate key).
+        Checks if the given determinant_set is a superkey: it contains the primary key or a candidate key,
+        or its closure under the relation's FDs covers every attribute of the relation.
         """
-        # Check if the determinant is the primary key or a superkey
-        if determinant_set.issuperset(relation.pk):
-            return True
-        
-        # Ensure cks is not None before iterating
-        if relation.cks:
-            for ck in relation.cks:
-                if determinant_set.issuperset(ck):
-                    return True
-        return False
+        return relation.is_superkey(determinant_set)
 
     @staticmethod
     def is_prime_attribute(relation: Relation, dependent_set: frozenset) -> bool:
@@ -79,16 +73,18 @@ class ThreeNF:
             pk=new_pk,
             cks=relation.cks.copy() if relation.cks is not None else [],  # Handle NoneType
             MvalAttr=relation.MvalAttr,
-            df=relation.df.copy() if relation.df is not None else None
+            df=relation.shared_data()
         )
-        remaining_fd_map = relation.fd_map.copy()
+        # Decompose over the minimal cover: no redundant FDs and no extraneous determinant attributes
+        cover = relation.cover_items()
+        remaining_fd_map = dict(cover)
 
         print(f"Initial attributes of relation {relation.tablename}: {relation.attributes}")
         print(f"Initial FD map: {relation.fd_map}")
 
         #relation_counter = 1
         base_name = relation.tablename+"3NF"  # Capture the base name of the relation
-        for determinant, dependent in relation.fd_map.items():
+        for determinant, dependent in cover:
             print(f"Analyzing FD: {determinant} -> {dependent}")
 
             # Check if the determinant is not already part of the primary key or candidate keys
@@ -111,7 +107,7 @@ class ThreeNF:
                     pk=new_relation_pk,  # Ensure pk is a set or a single attribute
                     cks=[],  # Candidate keys will be handled separately
                     MvalAttr=None,
-                    df=relation.df[list(new_relation_attributes)].copy() if relation.df is not None else None
+                    df=relation.project(new_relation_attributes)
                 )
                 print(f"New relation created: {new_relation.tablename} with attributes {new_relation.attributes} and primary key {new_relation.pk}")
                 
@@ -173,6 +169,83 @@ class ThreeNF:
         print(f"Normalization complete. Normalized relations: {[rel.tablename for rel in normalized_relations]}")
         return normalized_relations
 
+    @staticmethod
+    def synthesise(relation: Relation):
+        """
+        Bernstein 3NF synthesis, an alternative to normalise() that needs a single pass:
+        - take the minimal cover of the relation's FDs,
+        - group the FDs whose determinants are equivalent (same closure),
+        - create one relation per group, dropping schemas contained in another one,
+        - add a relation on a candidate key if no schema contains one.
+        The schemas are settled before any data is touched; each result holds one lazy projection.
+        """
+        print(f"Starting 3NF synthesis for relation: {relation.tablename}")
+        universe = relation.universe
+        attributes_mask = relation.mask(relation.attributes)
+        cover = [(lhs, rhs & attributes_mask) for lhs, rhs in relation.minimal_cover()
+                 if AttributeUniverse.is_subset(lhs, attributes_mask) and rhs & attributes_mask]
+        engine = ClosureEngine.from_masks(universe, cover)
+
+        # Group FDs by the closure of their determinant
+        groups = {}
+        for lhs, rhs in cover:
+            groups.setdefault(engine.closure(lhs), []).append((lhs, rhs))
+
+        schemas = []  # (attribute mask, FDs of the group)
+        for fds in groups.values():
+            schema = 0
+            for lhs, rhs in fds:
+                schema |= lhs | rhs
+            schemas.append((schema, fds))
+
+        # A lossless synthesis needs one schema that contains a candidate key
+        candidate_keys = [relation.mask(key) for key in relation.candidate_keys(use_keys=False)]
+        declared_key = relation.mask(relation.pk)
+        key = declared_key if declared_key in candidate_keys else (candidate_keys[0] if candidate_keys else attributes_mask)
+        if not any(AttributeUniverse.is_subset(candidate, schema) for candidate in candidate_keys for schema, _ in schemas):
+            print(f"No synthesized relation contains a key; adding key relation on {universe.names_of(key)}")
+            schemas.append((key, []))
+
+        # Drop schemas contained in another one (the first of two equal schemas stays); the FDs of a
+        # dropped schema move to a kept schema containing it, so none of them is lost
+        kept = [i for i, (schema, _) in enumerate(schemas)
+                if not any(j != i and AttributeUniverse.is_subset(schema, other) and (schema != other or j < i)
+                           for j, (other, _) in enumerate(schemas))]
+        merged = {i: list(schemas[i][1]) for i in kept}
+        for i, (schema, fds) in enumerate(schemas):
+            if i not in merged:
+                container = next(j for j in kept if AttributeUniverse.is_subset(schema, schemas[j][0]))
+                merged[container].extend(fds)
+
+        synthesized = []
+        for i in kept:
+            schema, own_fds = schemas[i]
+            fds = merged[i]
+            attributes = universe.names_of(schema)
+            pk = universe.names_of(own_fds[0][0]) if own_fds else universe.names_of(key)
+            new_relation = Relation(
+                tablename=f"{relation.tablename}_3NF_{'_'.join(sorted(attributes))}",
+                attributes=attributes,
+                pk=pk,
+                cks=[],
+                MvalAttr=set(),
+                df=relation.project(attributes)
+            )
+            new_relation.universe = universe
+            for lhs, rhs in fds:
+                new_relation.add_fd(universe.names_of(lhs), universe.names_of(rhs))
+            for mvd_determinant, mvd_dependent_lists in deepcopy(relation.mvd_map).items():
+                for mvd_dependent_list in mvd_dependent_lists:
+                    if mvd_determinant.union(*mvd_dependent_list) <= attributes:
+                        print(f"Moving MVD: {mvd_determinant} -->> {mvd_dependent_list}")
+                        new_relation.add_mvd(mvd_determinant, mvd_dependent_list)
+            new_relation.cks = ThreeNF.identify_candidate_keys(new_relation)
+            print(f"Synthesized relation {new_relation.tablename} with attributes {attributes} and primary key {pk}")
+            synthesized.append(new_relation)
+
+        print(f"Synthesis complete. Relations: {[rel.tablename for rel in synthesized]}")
+        return synthesized
+
     @staticmethod
     def update_keys(original_relation, normalized_relations, remaining_relation):
         """
@@ -235,17 +308,13 @@ class ThreeNF:
     def identify_candidate_keys(relation: Relation):
         """
         Identifies candidate keys for the new relations after decomposition.
+        The keys are enumerated from the relation's FDs and declared keys, not filtered from the input keys.
         """
         print(f"Identifying candidate keys for {relation.tablename}")
         # Ensure relation.cks is initialized as a list if it’s None
         if relation.cks is None:
             relation.cks = []
-        candidate_keys = []
-
-        # Check which candidate keys are still valid in the new relation
-        for ck in relation.cks:
-            if all(attr in relation.attributes for attr in ck):
-                candidate_keys.append(ck)
+        candidate_keys = relation.candidate_keys()
 
         # If no candidate keys are found, leave it empty
         if not candidate_keys:
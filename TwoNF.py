@@ -21,10 +21,18 @@ class TwoNF:
         # Check for partial dependencies
         for determinant, dependents in table.fd_map.items():
             for key in keys:
-                if (dependents - prime_attributes) and (determinant <= prime_attributes) and (determinant not in keys):
+                if TwoNF.is_partial_dependency(determinant, dependents, keys, prime_attributes):
                     return False
         return True
 
+    @staticmethod
+    def is_partial_dependency(determinant, dependents, keys, prime_attributes) -> bool:
+        """
+        An FD is a partial dependency when it adds non-prime attributes and its determinant lies
+        within the prime attributes without being a key.
+        """
+        return bool(dependents - prime_attributes) and determinant <= prime_attributes and determinant not in keys
+
     @staticmethod
     def normalise(relation: Relation):
         """ Normalize the relation to 2NF by removing partial dependencies. """
@@ -36,16 +44,15 @@ class TwoNF:
         # Iterate through each FD in the relation
         for determinant, dependents in relation.fd_map.items():
             # Identify partial dependencies based on the prime attributes
-            if (dependents - prime_attributes) and (determinant <= prime_attributes) and (determinant not in original_keys):
+            if TwoNF.is_partial_dependency(determinant, dependents, original_keys, prime_attributes):
                 
                 new_pk = determinant
                 new_cks = [ck for ck in relation.cks if ck <= determinant.union(dependents)]
                 new_attr = determinant.union(dependents)
 
-                # Create a new DataFrame for the relation
-                if relation.df is not None:
-                    new_df = deepcopy(relation.df[list(new_attr)])
-                else:
+                # Project the data lazily; rows are only extracted when the new relation reads them
+                new_df = relation.project(new_attr)
+                if new_df is None:
                     new_df = pd.DataFrame(columns=list(new_attr))
 
                 # Create the new relation
@@ -64,13 +71,9 @@ class TwoNF:
                 # Ensure fd_dependents is processed as a set of attributes
                     original_keys = [relation.base_relation.pk] + list(relation.base_relation.cks)
                     prime_attributes = set().union(*original_keys)
-                    if (fd_dependents - prime_attributes) and (fd_determinant <= prime_attributes) and (fd_determinant not in original_keys):
+                    if TwoNF.is_partial_dependency(fd_determinant, fd_dependents, original_keys, prime_attributes):
                         continue
-                    if isinstance(fd_dependents, str):
-                        fd_dependents = {fd_dependents}  # Convert to set if it's a single string
-                    elif isinstance(fd_dependents, set) and len(fd_dependents) == 1 and isinstance(next(iter(fd_dependents)), str):
-                    # Split the only element if it represents multiple attributes
-                        fd_dependents = {attr.strip() for attr in next(iter(fd_dependents)).split(',')}
+                    # fd_map stores dependents as sets of single attributes (see FDMap)
                     print("FD dependents:", fd_dependents)
                 
                     print("FD dependents:", len(fd_dependents))
@@ -84,7 +87,7 @@ class TwoNF:
                 for fd_determinant, fd_dependents in deepcopy(relation.fd_map).items():
                     original_keys = [relation.base_relation.pk] + list(relation.base_relation.cks)
                     prime_attributes = set().union(*original_keys)
-                    if (fd_dependents - prime_attributes) and (fd_determinant <= prime_attributes) and (fd_determinant not in original_keys):
+                    if TwoNF.is_partial_dependency(fd_determinant, fd_dependents, original_keys, prime_attributes):
                         if(fd_determinant==determinant and fd_dependents==dependents):
                             continue
                         print('fd_determinant',fd_determinant)
@@ -116,11 +119,10 @@ class TwoNF:
             print("-----NEW_relationAttr",new_relation_attr)  # Add PK if not already present
             new_cks = [ck for ck in relation.base_relation.cks if ck <= new_relation_attr]
 
-            # Create a new DataFrame for the leftover relation
+            # Project the base data lazily for the leftover relation
             print(new_relation_attr)
-            if relation.base_relation.df is not None and new_relation_attr:
-                new_df = deepcopy(relation.base_relation.df[list(new_relation_attr)])
-            else:
+            new_df = relation.base_relation.project(new_relation_attr) if new_relation_attr else None
+            if new_df is None:
                 new_df = pd.DataFrame(columns=list(new_relation_attr))
 
             # Create the leftover relation
@@ -171,7 +173,7 @@ class TwoNF:
         for fd_determinant, fd_dependents in relation.fd_map.items():
             original_keys = [relation.base_relation.pk] + list(relation.base_relation.cks)
             prime_attributes = set().union(*original_keys)
-            if (fd_dependents - prime_attributes) and (fd_determinant <= prime_attributes) and (fd_determinant not in original_keys):
+            if TwoNF.is_partial_dependency(fd_determinant, fd_dependents, original_keys, prime_attributes):
                 continue
             fd_union = fd_determinant.union(fd_dependents)
             
@@ -181,7 +183,7 @@ class TwoNF:
                 if missing_attrs:
                     # Create a new frozenset with the added attributes
                     new_relation.attributes = current_attrs.union(missing_attrs)
-                    new_relation.df = relation.df[list(new_relation.attributes)].copy()
+                    new_relation.df = relation.project(new_relation.attributes)
                     new_relation.add_fd(fd_determinant, fd_dependents)
                     new_relation.cks = [ck for ck in relation.base_relation.cks if ck <= new_relation.attributes]
 
@@ -198,7 +200,7 @@ class TwoNF:
                     if missing_attrs:
                         # Create a new frozenset with the added attributes
                         new_relation.attributes = current_attrs.union(missing_attrs)
-                        new_relation.df = relation.df[list(new_relation.attributes)].copy()
+                        new_relation.df = relation.project(new_relation.attributes)
                         new_relation.add_mvd(mvd_determinant, mvd_dependent_list)
                         new_relation.cks = [ck for ck in relation.base_relation.cks if ck <= new_relation.attributes]
 
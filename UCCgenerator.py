@@ -0,0 +1,118 @@
+import numpy as np
+from ClosureEngine import ClosureEngine
+from AttributeUniverse import AttributeUniverse
+from ColumnEncoding import as_encoded
+from Partitions import PartitionCache
+
+class UCCgenerator:
+    """
+    Discover the minimal unique column combinations (keys) of a table from its data, HyUCC style.
+    Sampling and validation alternate on bitmasks of the columns:
+    - rows that are close together in a column's partition are compared, and the columns on
+      which they agree form a non-unique combination,
+    - the candidate keys are the minimal combinations contained in no non-unique one, obtained by
+      specializing every candidate that a new non-unique combination contains,
+    - each candidate is validated on its stripped partition (shared PartitionCache); a failed
+      validation yields a duplicate pair of rows, whose agreement is fed back as a non-unique
+      combination.
+    Only candidates are ever validated, so the work follows the number of keys rather than
+    the number of row pairs.
+    """
+    # Row pairs compared per column in the sampling phase, as a multiple of the number of rows
+    sample_factor = 1
+
+    def __init__(self, df, attributes=None):
+        """ Only the columns in attributes (all by default) are used. """
+        self.table = as_encoded(df)
+        self.columns = [col for col in self.table.columns if attributes is None or col in attributes]
+        self.universe = AttributeUniverse(self.columns)  # bit position i is self.columns[i]
+        self.partitions = PartitionCache.of(self.table)
+
+    def agree_masks(self, first, second):
+        """ The distinct bitmasks of the columns on which the pairs of rows agree, as a set of ints. """
+        words = np.zeros((len(first), (len(self.columns) + 63) // 64), dtype=np.uint64)
+        for position, col in enumerate(self.columns):
+            codes = self.table.codes[col]
+            words[:, position // 64] |= (codes[first] == codes[second]).astype(np.uint64) << np.uint64(position % 64)
+        return {sum(int(word) << (64 * index) for index, word in enumerate(row)) for row in np.unique(words, axis=0)}
+
+    def sample_non_uniques(self):
+        """ Agree sets of neighbouring rows inside the classes of every single-column partition. """
+        limit = max(1, self.sample_factor * self.table.nrows)
+        agree = set()
+        for col in self.columns:
+            partition = self.partitions.get([col])
+            order = np.argsort(partition.labels, kind="stable")
+            rows, labels = partition.rows[order], partition.labels[order]
+            neighbours = np.flatnonzero(labels[1:] == labels[:-1])[:limit]
+            agree |= self.agree_masks(rows[neighbours], rows[neighbours + 1])
+        return agree
+
+    @staticmethod
+    def specialize(candidates, non_unique, full, uccs=()):
+        """
+        Replace every candidate contained in a non-unique combination by its minimal extensions;
+        extensions containing another candidate or a known key are dropped.
+        """
+        kept = [candidate for candidate in candidates if candidate & ~non_unique]
+        extended = []
+        for candidate in candidates:
+            if candidate & ~non_unique == 0:
+                for position in ClosureEngine.positions(full & ~non_unique):
+                    extended.append(candidate | (1 << position))
+        for candidate in sorted(set(extended), key=lambda mask: mask.bit_count()):
+            if not any(other & ~candidate == 0 for other in kept) and not any(ucc & ~candidate == 0 for ucc in uccs):
+                kept.append(candidate)
+        return kept
+
+    def find_all_uccs(self):
+        """ Return the minimal unique column combinations as frozensets, smallest first. """
+        full = (1 << len(self.columns)) - 1
+        candidates = [0]
+        for non_unique in sorted(self.sample_non_uniques(), key=lambda mask: -mask.bit_count()):
+            candidates = self.specialize(candidates, non_unique, full)
+
+        validations = 0
+        uccs = []
+        while candidates:
+            candidate = candidates.pop()
+            validations += 1
+            partition = self.partitions.get(self.universe.names_of(candidate))
+            if partition.is_unique():
+                uccs.append(candidate)
+                continue
+            # A duplicate pair of the candidate: its agreement is a non-unique combination missed by the sample
+            pair = partition.rows[np.flatnonzero(partition.labels == 0)[:2]]
+            non_unique = self.agree_masks(pair[:1], pair[1:]).pop()
+            candidates = self.specialize(candidates + [candidate], non_unique, full, uccs)
+
+        print(f"UCC discovery found {len(uccs)} minimal keys with {validations} validations.")
+        keys = [frozenset(self.universe.names_of(mask)) for mask in uccs]
+        return sorted(keys, key=lambda key: (len(key), sorted(map(str, key))))
+
+    @staticmethod
+    def check_keys(relation):
+        """
+        Discover the keys of a relation's data and flag the declared primary and candidate keys
+        that the data does not support (duplicate values or unknown attributes).
+        Returns (minimal keys, unsupported declared keys).
+        """
+        print(f"Checking the declared keys of relation {relation.tablename} against its data...")
+        if relation.encoded is None:
+            print("The relation has no data to check the keys against.")
+            return [], []
+        generator = UCCgenerator(relation.encoded, relation.attributes)
+        keys = generator.find_all_uccs()
+        unsupported = []
+        for declared in [relation.pk] + list(relation.cks or []):
+            declared = frozenset(declared)
+            if not declared <= set(generator.columns):
+                print(f"Declared key {set(declared)} refers to attributes missing from the data.")
+                unsupported.append(declared)
+            elif not generator.partitions.get(declared).is_unique():
+                print(f"Declared key {set(declared)} is not unique in the data.")
+                unsupported.append(declared)
+            elif declared not in keys:
+                print(f"Declared key {set(declared)} is unique but not minimal.")
+        print(f"Minimal keys in the data: {[set(key) for key in keys]}")
+        return keys, unsupported
@@ -0,0 +1,68 @@
+import random
+from itertools import combinations
+from BCNF import BCNF
+from Relation import Relation
+
+
+def closure(attributes, fds):
+    """ Brute-force closure of an attribute set under (lhs, rhs) pairs. """
+    closed = set(attributes)
+    changed = True
+    while changed:
+        changed = False
+        for lhs, rhs in fds:
+            if lhs <= closed and not rhs <= closed:
+                closed |= rhs
+                changed = True
+    return closed
+
+
+def subsets(attributes):
+    attributes = sorted(attributes)
+    for size in range(len(attributes) + 1):
+        for subset in combinations(attributes, size):
+            yield set(subset)
+
+
+def in_bcnf(fragment, fds):
+    """ Every subset that determines more of the fragment than itself determines all of it. """
+    for subset in subsets(fragment):
+        determined = closure(subset, fds) & fragment
+        if determined - subset and determined != fragment:
+            return False
+    return True
+
+
+def decompose(attributes, fds):
+    relation = Relation("R", set(attributes), set(attributes), [], set())
+    for lhs, rhs in fds:
+        relation.add_fd(set(lhs), set(rhs))
+    return BCNF.decompose_polynomial(relation)
+
+
+def check(attributes, fds):
+    fragments = decompose(attributes, fds)
+    assert set().union(*(fragment.attributes for fragment in fragments)) == set(attributes)
+    for fragment in fragments:
+        assert in_bcnf(fragment.attributes, fds), (fds, fragment.attributes)
+        assert BCNF.isin(fragment)
+        # The fragment's FDs are equivalent to the FDs projected on it
+        own = [(set(lhs), set(rhs)) for lhs, rhs in fragment.fd_map.items()]
+        for subset in subsets(fragment.attributes):
+            assert closure(subset, own) & fragment.attributes == closure(subset, fds) & fragment.attributes
+
+
+def test_fd_holding_only_on_the_projection():
+    check("ABCDEF", [({"D"}, {"E"}), ({"E", "C"}, {"F"})])
+
+
+def test_random_schemas_against_brute_force():
+    rnd = random.Random(16)
+    for _ in range(400):
+        attributes = "ABCDEF"[:rnd.randint(2, 6)]
+        fds = []
+        for _ in range(rnd.randint(1, 5)):
+            lhs = set(rnd.sample(attributes, rnd.randint(1, min(3, len(attributes) - 1))))
+            rhs = set(rnd.sample(sorted(set(attributes) - lhs), 1))
+            fds.append((lhs, rhs))
+        check(attributes, fds)
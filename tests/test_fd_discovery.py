@@ -0,0 +1,44 @@
+import random
+from itertools import combinations
+import pandas as pd
+from FDgenerator import FDgenerator
+from NormalizationManager import NormalizationManager
+from Relation import Relation
+
+
+def holds(df, determinant, dependent):
+    if not determinant:
+        return df[dependent].nunique() <= 1
+    return (df.groupby(list(determinant))[dependent].nunique() <= 1).all()
+
+
+def brute_force_fds(df, max_lhs=None):
+    """ Minimal non-trivial FDs X -> A: no proper subset of X determines A. """
+    fds = set()
+    columns = list(df.columns)
+    for dependent in columns:
+        others = [col for col in columns if col != dependent]
+        for size in range(0, len(others) + 1 if max_lhs is None else max_lhs + 1):
+            for determinant in combinations(others, size):
+                determinant = frozenset(determinant)
+                if any(lhs <= determinant for lhs, rhs in fds if rhs == dependent):
+                    continue
+                if holds(df, determinant, dependent):
+                    fds.add((determinant, dependent))
+    return fds
+
+
+def test_fds_match_brute_force():
+    rnd = random.Random(17)
+    for _ in range(40):
+        ncols, nrows = rnd.randint(1, 5), rnd.randint(1, 25)
+        df = pd.DataFrame({col: [rnd.randint(0, 2) for _ in range(nrows)] for col in "ABCDE"[:ncols]})
+        assert set(FDgenerator(df).find_all_fds()) == brute_force_fds(df)
+        assert set(FDgenerator(df, max_lhs=1).find_all_fds()) == brute_force_fds(df, max_lhs=1)
+
+
+def test_relation_without_data():
+    relation = Relation("R", {"A", "B"}, {"A"}, [], set())
+    assert FDgenerator.discover(relation) == {}
+    NormalizationManager([relation], "1NF", discover_fds=True)
+    assert dict(relation.fd_map) == {}
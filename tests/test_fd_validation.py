@@ -0,0 +1,42 @@
+import pandas as pd
+import pytest
+from FDvalidator import FDvalidator
+from NormalizationManager import NormalizationManager
+from Relation import Relation
+
+
+def relation():
+    data = pd.DataFrame({"A": [1, 1, 2, 2, 3], "B": [1, 2, 1, 1, 1], "C": [5, 5, 6, 7, 8]})
+    rel = Relation("R", {"A", "B", "C"}, {"A", "B"}, [], set(), data)
+    rel.add_fd({"A"}, {"C"})  # violated: A = 2 has C = 6 and C = 7
+    rel.add_fd({"B"}, {"A"})  # violated: B = 1 has A = 1 and A = 2
+    rel.add_fd({"C"}, {"A"})  # holds
+    return rel
+
+
+def test_violated_fds_come_with_a_pair_of_rows():
+    rel = relation()
+    violations = FDvalidator.verify(rel)
+    assert {(determinant, dependent) for determinant, dependent, _ in violations} == \
+        {(frozenset("A"), "C"), (frozenset("B"), "A")}
+    df = rel.df
+    for determinant, dependent, (row, other) in violations:
+        assert row != other
+        assert all(df[col].iloc[row] == df[col].iloc[other] for col in determinant)
+        assert df[dependent].iloc[row] != df[dependent].iloc[other]
+
+
+def test_fds_on_missing_attributes_are_reported():
+    validator = FDvalidator(relation().df)
+    assert validator.violations([({"A"}, {"D"})]) == [(frozenset("A"), "D", None)]
+    assert validator.violations([({"C"}, {"A"})]) == []
+
+
+def test_violation_stops_the_manager_before_normalizing(monkeypatch):
+    def fail(*args, **kwargs):
+        raise AssertionError("normalization ran")
+
+    monkeypatch.setattr(NormalizationManager, "normalize", fail)
+    monkeypatch.setattr(NormalizationManager, "check_relations", fail)
+    with pytest.raises(ValueError, match="violated"):
+        NormalizationManager([relation()], "BCNF", verify_dependencies=True)
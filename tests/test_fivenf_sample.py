@@ -0,0 +1,18 @@
+import os
+from NormalizationManager import NormalizationManager
+from RelationLoader import load_relation
+
+SAMPLE = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "InputFiles", "InputFile5.xlsx")
+
+
+def test_sample_5nf_decomposition(tmp_path, monkeypatch):
+    """ Pins the join dependency chosen for InputFile5 since redundant components are no longer generated. """
+    monkeypatch.chdir(tmp_path)  # FiveNF writes its reports to the working directory
+    relation, level = load_relation(SAMPLE)
+    relations = NormalizationManager([relation], level).normalize(output_file=str(tmp_path / "schema.txt"))
+    assert level == "5NF"
+    assert sorted(sorted(rel.attributes) for rel in relations) == [
+        ["CustomerID", "DrinkID", "Milk"],
+        ["CustomerID", "Milk", "OrderID"],
+        ["DrinkID", "Milk", "OrderID"],
+    ]
@@ -0,0 +1,58 @@
+import os
+import random
+from itertools import combinations
+from NormalizationManager import NormalizationManager
+from Relation import Relation
+from RelationLoader import load_relation
+
+SAMPLE = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "InputFiles", "3NF_InputFile_1.xlsx")
+
+
+def closure(attributes, fds):
+    closed = set(attributes)
+    changed = True
+    while changed:
+        changed = False
+        for lhs, rhs in fds:
+            if lhs <= closed and not rhs <= closed:
+                closed |= rhs
+                changed = True
+    return closed
+
+
+def brute_force_keys(attributes, fds):
+    """ Superkeys none of whose proper subsets is a superkey, smallest first. """
+    keys = []
+    for size in range(len(attributes) + 1):
+        for candidate in combinations(sorted(attributes), size):
+            candidate = set(candidate)
+            if any(key <= candidate for key in keys):
+                continue
+            if closure(candidate, fds) >= attributes:
+                keys.append(candidate)
+    return keys
+
+
+def test_keys_match_brute_force():
+    rng = random.Random(13)
+    attributes = set("ABCDEF")
+    for _ in range(100):
+        relation = Relation("R", attributes, set(), [], set(), None)
+        fds = []
+        for _ in range(rng.randint(0, 6)):
+            lhs = set(rng.sample(sorted(attributes), rng.randint(1, 3)))
+            rhs = set(rng.sample(sorted(attributes - lhs), 1))
+            relation.add_fd(lhs, rhs)
+            fds.append((lhs, rhs))
+        expected = brute_force_keys(attributes, fds)
+        assert relation.candidate_keys(use_keys=False) == \
+            sorted(expected, key=lambda key: (len(key), sorted(key)))
+
+
+def test_sample_schema_lists_the_implied_keys(tmp_path):
+    """ Pins the keys printed for 3NF_InputFile_1, which declares a primary key but no candidate keys. """
+    relation, level = load_relation(SAMPLE)
+    output = tmp_path / "schema.txt"
+    NormalizationManager([relation], level).normalize(output_file=str(output))
+    lines = [line for line in output.read_text().splitlines() if line.startswith("- Candidate Keys:")]
+    assert lines[-2:] == ["- Candidate Keys: County_Name", "- Candidate Keys: Property_ID"]
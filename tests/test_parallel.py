@@ -0,0 +1,61 @@
+import random
+import pandas as pd
+from FiveNF import FiveNF
+from NormalizationManager import NormalizationManager
+from Relation import Relation
+from TwoNF import TwoNF
+
+
+def relations():
+    data = pd.DataFrame({"A": [1, 1, 2], "B": [1, 2, 1], "C": [3, 3, 4]})
+    first = Relation("R", {"A", "B", "C"}, {"A", "B"}, [], set(), data)
+    first.add_fd({"A"}, {"C"})
+    first.base_relation = first
+    second = first.copy()
+    second.tablename = "S"
+    return [first, second]
+
+
+def test_unpicklable_relations_fall_back_to_serial():
+    def local():
+        pass
+
+    parallel = relations()
+    for relation in parallel:
+        relation.note = local  # a local function cannot be pickled
+    manager = NormalizationManager(parallel, "2NF", workers=2)
+    outcomes = manager.check_relations(TwoNF, parallel, parallel[0])
+    serial = relations()
+    expected = NormalizationManager(serial, "2NF").check_relations(TwoNF, serial, serial[0])
+    assert [[sorted(r.attributes) for r in outcome] for outcome in outcomes] == \
+        [[sorted(r.attributes) for r in outcome] for outcome in expected]
+
+
+def test_pool_matches_serial_run():
+    parallel = relations()
+    outcomes = NormalizationManager(parallel, "2NF", workers=2).check_relations(TwoNF, parallel, parallel[0])
+    serial = relations()
+    expected = NormalizationManager(serial, "2NF").check_relations(TwoNF, serial, serial[0])
+    assert all(outcome is not None for outcome in outcomes)
+    assert [[(r.tablename, sorted(r.attributes), sorted(r.pk)) for r in outcome] for outcome in outcomes] == \
+        [[(r.tablename, sorted(r.attributes), sorted(r.pk)) for r in outcome] for outcome in expected]
+
+
+def test_5nf_pool_search_matches_serial(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(FiveNF, "chunk_size", 4)  # several chunks for a small relation
+    rng = random.Random(7)
+    data = pd.DataFrame([[rng.randint(0, 1) for _ in range(4)] for _ in range(6)], columns=list("ABCD"))
+    relation = Relation("R", set("ABCD"), set(), [], set(), data)
+    serial = FiveNF.find_join_dependencies(relation)
+    assert FiveNF.find_join_dependencies(relation, workers=2) == serial
+    assert FiveNF.find_join_dependencies(relation, first_only=True, workers=2) == serial[:1]
+
+
+def test_workers_are_passed_to_the_5nf_search_per_call(monkeypatch):
+    seen = []
+    monkeypatch.setattr(FiveNF, "isin", staticmethod(lambda relation, workers=1: seen.append(workers) or True))
+    relation = relations()[0]
+    NormalizationManager([relation], "5NF", workers=3).check_relations(FiveNF, [relation], relation)
+    NormalizationManager([relation], "5NF").check_relations(FiveNF, [relation], relation)
+    assert seen == [3, 1]
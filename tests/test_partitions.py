@@ -0,0 +1,22 @@
+import pandas as pd
+import pytest
+from ColumnEncoding import EncodedTable
+from MVDvalidator import MVDvalidator
+from Partitions import PartitionCache
+
+
+def table():
+    return EncodedTable.from_dataframe(pd.DataFrame({"A": [1, 1, 2], "B": [1, 2, 3], "C": [1, 1, 1]}))
+
+
+def test_unknown_columns_raise_key_error():
+    cache = PartitionCache.of(table())
+    with pytest.raises(KeyError):
+        cache.get(["A", "Typo"])
+    with pytest.raises(KeyError):
+        cache.get(["Typo"])
+
+
+def test_mvd_on_unknown_column_is_not_accepted():
+    with pytest.raises(KeyError):
+        MVDvalidator(table()).holds(["A"], ["B"], ["Typo"])
@@ -0,0 +1,22 @@
+import pandas as pd
+from Relation import Relation
+
+
+def relation():
+    data = pd.DataFrame({"A": [1, 1, 1, 1], "B": [1, 2, 1, 2], "C": [1, 2, 2, 1]})
+    return Relation("R", {"A", "B", "C"}, {"A", "B", "C"}, [], set(), data)
+
+
+def test_editing_the_dataframe_in_place_is_seen_by_validation():
+    rel = relation()
+    assert rel.validate_each_mvd(("A",), (("B",), ("C",)))
+    rel.df.loc[3, "C"] = 3
+    assert not rel.validate_each_mvd(("A",), (("B",), ("C",)))
+
+
+def test_projection_is_not_changed_by_editing_the_parent():
+    rel = relation()
+    child = Relation("S", {"A", "C"}, {"A", "C"}, [], set(), rel.project(["A", "C"], distinct=False))
+    rel.df.loc[0, "C"] = 9
+    assert list(child.encoded.codes["C"]) == [0, 1, 1, 0]
+    assert 9 not in set(child.df["C"])
@@ -0,0 +1,14 @@
+from FDvalidator import FDvalidator
+from RelationLoader import load_relation
+
+
+def test_csv_header_whitespace_is_stripped(tmp_path):
+    data = tmp_path / "orders.csv"
+    data.write_text(" A,B \n1,x\n2,y\n")
+    (tmp_path / "orders.csv.meta.txt").write_text("3NF\nOrders\nA\nNone\nNone\nA --> B\n")
+    relation, level = load_relation(str(data))
+    assert level == "3NF"
+    assert relation.attributes == {"A", "B"}
+    assert list(relation.encoded.columns) == ["A", "B"]
+    assert relation.fd_map == {frozenset({"A"}): {"B"}}
+    assert FDvalidator.verify(relation) == []
@@ -0,0 +1,43 @@
+import pandas as pd
+import NormalizationManager as manager_module
+from NormalizationManager import NormalizationManager
+from Relation import Relation
+from ResultCache import ResultCache
+
+
+def relation():
+    data = pd.DataFrame({"A": [1, 2, 3, 4], "B": [1, 1, 2, 2], "C": [5, 5, 6, 6]})
+    rel = Relation("R", {"A", "B", "C"}, {"A"}, [], set(), data)
+    rel.add_fd({"B"}, {"C"})
+    rel.base_relation = rel  # as RelationLoader sets it
+    return rel
+
+
+def run(tmp_path, name, **options):
+    output = tmp_path / name
+    manager = NormalizationManager([relation()], "3NF", cache_dir=str(tmp_path / "cache"), **options)
+    relations = manager.normalize(output_file=str(output))
+    # Sets rebuilt by unpickling may print in another order, so relations are compared canonically
+    described = [ResultCache.canonical([rel.tablename, rel.attributes, rel.pk, rel.cks, dict(rel.fd_map), rel.foreign_keys])
+                 for rel in relations]
+    return manager, described, output.read_text()
+
+
+def test_hit_returns_the_stored_run_without_discovery(tmp_path, monkeypatch):
+    _, relations, text = run(tmp_path, "first.txt", discover_fds=True, check_keys=True)
+
+    def fail(*args, **kwargs):
+        raise AssertionError("discovery ran on a cache hit")
+
+    monkeypatch.setattr(manager_module.FDgenerator, "discover", fail)
+    monkeypatch.setattr(manager_module.UCCgenerator, "check_keys", fail)
+    manager, cached_relations, cached_text = run(tmp_path, "second.txt", discover_fds=True, check_keys=True)
+    assert manager.result_cache.hits == 1
+    assert cached_text == text
+    assert cached_relations == relations
+
+
+def test_options_are_part_of_the_key(tmp_path):
+    run(tmp_path, "first.txt")
+    manager, _, _ = run(tmp_path, "second.txt", three_nf_mode="synthesis")
+    assert manager.result_cache.hits == 0
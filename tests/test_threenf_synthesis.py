@@ -0,0 +1,37 @@
+import pandas as pd
+from NormalizationManager import NormalizationManager
+from Relation import Relation
+from ThreeNF import ThreeNF
+
+
+def relation():
+    # AB -> CD, C -> B, D -> E
+    data = pd.DataFrame({"A": [1, 1, 2, 2], "B": [1, 2, 1, 2], "C": [1, 2, 1, 2], "D": [1, 2, 3, 3], "E": [5, 6, 7, 7]})
+    rel = Relation("R", {"A", "B", "C", "D", "E"}, {"A", "B"}, [], set(), data)
+    rel.add_fd({"A", "B"}, {"C", "D"})
+    rel.add_fd({"C"}, {"B"})
+    rel.add_fd({"D"}, {"E"})
+    rel.base_relation = rel
+    return rel
+
+
+def implied(relation, determinant, dependent):
+    return dependent in relation.closure(determinant)
+
+
+def test_fds_of_a_contained_schema_survive_synthesis():
+    synthesized = ThreeNF.synthesise(relation())
+    schemas = {frozenset(rel.attributes): rel for rel in synthesized}
+    assert set(schemas) == {frozenset("ABCD"), frozenset("DE")}
+    abcd = schemas[frozenset("ABCD")]
+    assert implied(abcd, {"C"}, "B")
+    assert implied(abcd, {"A", "B"}, "D")
+
+
+def test_bcnf_level_splits_out_the_merged_fd(tmp_path):
+    manager = NormalizationManager([relation()], "BCNF", three_nf_mode="synthesis")
+    relations = manager.normalize(output_file=str(tmp_path / "schema.txt"))
+    schemas = {frozenset(rel.attributes) for rel in relations}
+    assert frozenset("BC") in schemas
+    assert frozenset("ABCD") not in schemas
+    assert frozenset("DE") in schemas
@@ -0,0 +1,43 @@
+import random
+from itertools import combinations
+import pandas as pd
+from NormalizationManager import NormalizationManager
+from Relation import Relation
+from UCCgenerator import UCCgenerator
+
+
+def brute_force_uccs(df):
+    """ Minimal column combinations without duplicate rows. """
+    uccs = []
+    for size in range(1, len(df.columns) + 1):
+        for columns in combinations(df.columns, size):
+            if any(set(ucc) <= set(columns) for ucc in uccs):
+                continue
+            if not df.duplicated(list(columns)).any():
+                uccs.append(frozenset(columns))
+    return set(uccs)
+
+
+def test_uccs_match_brute_force():
+    rnd = random.Random(19)
+    for _ in range(40):
+        ncols, nrows = rnd.randint(1, 5), rnd.randint(1, 30)
+        df = pd.DataFrame({col: [rnd.randint(0, 3) for _ in range(nrows)] for col in "ABCDE"[:ncols]})
+        assert set(UCCgenerator(df).find_all_uccs()) == brute_force_uccs(df)
+
+
+def test_non_unique_declared_key_is_flagged():
+    data = pd.DataFrame({"A": [1, 1, 2], "B": [1, 2, 3], "C": [1, 1, 2]})
+    relation = Relation("R", {"A", "B", "C"}, {"A"}, [{"B"}], set(), data)
+    relation.base_relation = relation
+    keys, unsupported = UCCgenerator.check_keys(relation)
+    assert keys == [frozenset({"B"})]
+    assert unsupported == [frozenset({"A"})]
+    manager = NormalizationManager([relation], "1NF", check_keys=True)
+    assert manager.unsupported_keys == {"R": [frozenset({"A"})]}
+
+
+def test_relation_without_data():
+    relation = Relation("R", {"A", "B"}, {"A"}, [], set())
+    assert UCCgenerator.check_keys(relation) == ([], [])
+    assert NormalizationManager([relation], "1NF", check_keys=True).unsupported_keys == {}
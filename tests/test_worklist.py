@@ -0,0 +1,32 @@
+import os
+from NormalizationManager import NormalizationManager
+from RelationLoader import load_relation
+
+SAMPLE = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "InputFiles", "3NF_InputFile_2_2.xlsx")
+
+
+def test_passed_relations_are_not_checked_again(tmp_path, monkeypatch):
+    relation, level = load_relation(SAMPLE)
+    manager = NormalizationManager([relation], level)
+    checks = []  # (normal form, relation, outcome) of every isin call
+    is_in = NormalizationManager.is_in
+
+    def recording_is_in(self, nf_class, relation):
+        outcome = is_in(self, nf_class, relation)
+        checks.append((nf_class, relation, outcome))
+        return outcome
+
+    monkeypatch.setattr(NormalizationManager, "is_in", recording_is_in)
+    manager.normalize(output_file=str(tmp_path / "schema.txt"))
+
+    # 2NF splits the relation and 3NF splits one of the parts, so both levels take a second pass
+    assert level == "3NF"
+    assert manager.check_stats == {
+        "1NF": {"passes": 1, "checks": 1, "avoided": 0},
+        "2NF": {"passes": 2, "checks": 3, "avoided": 0},
+        "3NF": {"passes": 2, "checks": 4, "avoided": 1},
+    }
+    assert len(checks) == sum(stats["checks"] for stats in manager.check_stats.values())
+    for index, (nf_class, checked, _) in enumerate(checks):
+        assert not any(earlier_class is nf_class and earlier is checked and outcome
+                       for earlier_class, earlier, outcome in checks[:index])